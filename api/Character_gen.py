@@ -1,8 +1,11 @@
 import os
 import base64
-import json
+import hashlib
+import shutil
 import asyncio
+import tempfile
 import httpx
+import orjson
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
@@ -14,14 +17,35 @@ router = APIRouter()
 HF_ROUTER = os.getenv("HF_ROUTER", "https://router.huggingface.co/hf-inference")
 HF_TOKEN = os.getenv("HF_TOKEN", "hf_CKlyvrwxptipsbigxjsKbyKnNKZuydHkb")
 GENERATED_DIR = "generated/characters"
+WRITE_BUFFER_SIZE = 1 << 20  # PNGs are ~1-3 MB; avoid the default 8 KB chunking
+B64_CHUNK = 4 * (1 << 18)  # 1 MB of base64 text per decode step
+CACHE_DIR = os.path.join(GENERATED_DIR, "_cache")
 
-os.makedirs(GENERATED_DIR, exist_ok=True)
+os.makedirs(CACHE_DIR, exist_ok=True)
 
 HEADERS = {
     "Authorization": f"Bearer {HF_TOKEN}",
     "Content-Type": "application/json"
 }
 
+# One pooled client for every HF call so the 5 angle requests (and every
+# later character) reuse the same TLS connections instead of handshaking each time.
+_HF_CLIENT = httpx.AsyncClient(
+    timeout=120.0,
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    headers=HEADERS,
+)
+
+
+# Cap in-flight HF generations across all requests so concurrent characters
+# queue here instead of exhausting the pool or tripping HF rate limits.
+_HF_SEM = asyncio.Semaphore(int(os.getenv("HF_MAX_CONCURRENCY", "10")))
+
+
+async def close_hf_client():
+    await _HF_CLIENT.aclose()
+
 # ---------------------------------------
 # INPUT MODEL FROM FRONTEND
 # ---------------------------------------
@@ -47,6 +71,13 @@ ANGLE_TEMPLATES = {
     "back": "{base_prompt}, back view, full body"
 }
 
+# Split each template around its placeholder once at import, so building
+# the per-request prompts is plain concatenation instead of str.format parsing.
+_ANGLE_PARTS = {
+    angle: tuple(template.split("{base_prompt}", 1))
+    for angle, template in ANGLE_TEMPLATES.items()
+}
+
 def build_base_prompt(traits: CharacterTraits):
     parts = [
         f"{traits.name}, {traits.gender}",
@@ -62,10 +93,86 @@ def build_base_prompt(traits: CharacterTraits):
     return ", ".join(parts)
 
 
+# ---------------------------------------
+# PROMPT CACHE
+# ---------------------------------------
+def _cache_key(prompt: str, width: int, height: int, seed, model: str):
+    raw = "\x1f".join([model, " ".join(prompt.split()), str(width), str(height), str(seed)])
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _restore_from_cache(cache_path: str, filepath: str):
+    try:
+        shutil.copyfile(cache_path, filepath)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _write_cache(cache_path: str, filepath: str):
+    # Write-then-rename so a concurrent reader never sees a partial PNG.
+    # Unique tmp name per call: concurrent requests for the same prompt
+    # must not rename each other's file away. The cache is best-effort, a
+    # failed write never fails a generation that already succeeded.
+    tmp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=CACHE_DIR, suffix=".tmp", delete=False) as tmp:
+            tmp_path = tmp.name
+            with open(filepath, "rb") as src:
+                shutil.copyfileobj(src, tmp)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️ Prompt cache write failed: {e}")
+        if tmp_path:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+# ---------------------------------------
+# SAVE IN FILESYSTEM
+# ---------------------------------------
+def image_path(folder: str, angle: str, nonce: str):
+    filename = f"{angle}_{nonce}.png"
+    return os.path.join(folder, filename)
+
+
+def image_url(filepath: str):
+    return f"/{filepath.replace(os.path.sep, '/')}"
+
+
+def write_b64_image(filepath: str, data: str):
+    # Decode slice by slice straight into the file so the full decoded PNG
+    # never sits in memory next to its base64 string. Slices are a multiple
+    # of 4 chars, so each one decodes on its own (HF sends no line breaks).
+    with open(filepath, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+        for i in range(0, len(data), B64_CHUNK):
+            f.write(base64.b64decode(data[i:i + B64_CHUNK]))
+
+
+def save_rig(folder: str, rig: dict):
+    # Serialize up front and rename into place, so readers only ever see
+    # a complete rig.json even if the process dies mid-write
+    data = orjson.dumps(rig)
+    tmp_path = os.path.join(folder, "rig.json.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, os.path.join(folder, "rig.json"))
+
+
 # ---------------------------------------
 # HF GENERATION FUNCTION
 # ---------------------------------------
-async def hf_generate_image(model: str, prompt: str, width=768, height=1152, seed=None):
+async def hf_generate_image(model: str, prompt: str, filepath: str, width=768, height=1152, seed=None):
+    # Only seeded generations are deterministic, so only those are cached;
+    # unseeded calls are expected to produce a fresh image every time.
+    cache_path = None
+    if seed is not None:
+        cache_path = os.path.join(CACHE_DIR, f"{_cache_key(prompt, width, height, seed, model)}.png")
+        if await asyncio.to_thread(_restore_from_cache, cache_path, filepath):
+            return filepath
+
     payload = {
         "inputs": prompt,
         "parameters": {
@@ -79,40 +186,46 @@ async def hf_generate_image(model: str, prompt: str, width=768, height=1152, see
     if seed is not None:
         payload["parameters"]["seed"] = seed
 
-    async with httpx.AsyncClient(timeout=120.0) as client:
-        response = await client.post(
-            f"{HF_ROUTER}/{model}",
-            headers=HEADERS,
-            json=payload
-        )
+    async with _HF_SEM:
+        response = await _HF_CLIENT.post(f"{HF_ROUTER}/{model}", json=payload)
 
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as e:
-            raise HTTPException(status_code=500, detail=f"HuggingFace Error: {str(e)}")
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError as e:
+        raise HTTPException(status_code=500, detail=f"HuggingFace Error: {str(e)}")
 
-    result = response.json()
+    result = orjson.loads(response.content)
 
     if "generated_image" not in result:
         raise HTTPException(status_code=500, detail="HF missing 'generated_image'")
 
-    return base64.b64decode(result["generated_image"])
+    # Decoding a multi-MB PNG is CPU work; keep it off the event loop
+    # so the other angles' network I/O keeps flowing.
+    await asyncio.to_thread(write_b64_image, filepath, result["generated_image"])
 
+    if cache_path:
+        await asyncio.to_thread(_write_cache, cache_path, filepath)
 
-# ---------------------------------------
-# SAVE IN FILESYSTEM
-# ---------------------------------------
-def save_image_bytes(character_id: str, angle: str, img_bytes: bytes):
-    folder = os.path.join(GENERATED_DIR, character_id)
-    os.makedirs(folder, exist_ok=True)
-
-    filename = f"{angle}_{os.urandom(3).hex()}.png"
-    filepath = os.path.join(folder, filename)
+    return filepath
 
-    with open(filepath, "wb") as f:
-        f.write(img_bytes)
 
-    return f"/{filepath.replace(os.path.sep, '/')}"
+async def hf_generate_batch(model: str, prompts: list[str], filepaths: list[str], width=768, height=1152, seed=None):
+    # The hf-inference text-to-image task only takes a single prompt per call,
+    # so a batch is fanned out over the shared pooled client (multiplexed on
+    # one HTTP/2 connection) rather than sent as one list payload.
+    tasks = [
+        asyncio.ensure_future(hf_generate_image(model, prompt, filepath, width=width, height=height, seed=seed))
+        for prompt, filepath in zip(prompts, filepaths)
+    ]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        # One angle failed (or the request was aborted): stop the others
+        # instead of letting them finish and write into a discarded folder
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
 
 
 # ---------------------------------------
@@ -123,29 +236,39 @@ async def create_character(traits: CharacterTraits):
     base_prompt = build_base_prompt(traits)
 
     prompts = {
-        angle: template.format(base_prompt=base_prompt)
-        for angle, template in ANGLE_TEMPLATES.items()
+        angle: head + base_prompt + tail
+        for angle, (head, tail) in _ANGLE_PARTS.items()
     }
 
     seed = traits.seed
 
-    tasks = [
-        hf_generate_image("stabilityai/sdxl-turbo", prompt, seed=seed)
-        for prompt in prompts.values()
-    ]
+    # Materialize (angle, prompt) pairs once so keys, prompts and paths stay aligned
+    items = list(prompts.items())
 
-    try:
-        results = await asyncio.gather(*tasks)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    # One getrandom call for the character id and every angle's filename nonce
+    rnd = os.urandom(4 + 3 * len(items))
+    character_id = f"char_{rnd[:4].hex()}"
+    folder = os.path.join(GENERATED_DIR, character_id)
+    os.makedirs(folder, exist_ok=True)
 
-    character_id = f"char_{os.urandom(4).hex()}"
-    angle_keys = list(prompts.keys())
+    paths = [
+        image_path(folder, angle_key, rnd[4 + 3 * i:7 + 3 * i].hex())
+        for i, (angle_key, _) in enumerate(items)
+    ]
 
-    urls = {}
-    for angle_key, img_bytes in zip(angle_keys, results):
-        url = save_image_bytes(character_id, angle_key, img_bytes)
-        urls[angle_key] = url
+    try:
+        await hf_generate_batch("stabilityai/sdxl-turbo", [prompt for _, prompt in items], paths, seed=seed)
+    except BaseException as e:
+        # Don't leave an empty/partial character folder behind
+        shutil.rmtree(folder, ignore_errors=True)
+        if isinstance(e, Exception):
+            raise HTTPException(status_code=500, detail=str(e))
+        raise
+
+    urls = {
+        angle_key: image_url(filepath)
+        for (angle_key, _), filepath in zip(items, paths)
+    }
 
     rig = {
         "character_id": character_id,
@@ -159,7 +282,6 @@ async def create_character(traits: CharacterTraits):
     }
 
     # Save rig.json
-    with open(os.path.join(GENERATED_DIR, character_id, "rig.json"), "w") as f:
-        json.dump(rig, f)
+    await asyncio.to_thread(save_rig, folder, rig)
 
     return {"status": "success", "character_id": character_id, "rig": rig}
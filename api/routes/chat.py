@@ -1,15 +1,41 @@
 # backend/api/routes/chat.py
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 import os
-import requests
+import re
+import asyncio
+import hashlib
+import httpx
+import orjson
 import time
 import uuid
 from datetime import datetime
+from database.sqlite_store import sqlite_db
+from core.responses import orjson_response
 
 router = APIRouter()
 
+# Shared async client for Groq and Replicate so outbound calls don't block
+# the event loop and reuse pooled connections across requests.
+_HTTP = httpx.AsyncClient(
+    timeout=30.0,
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+)
+
+# Polling knobs for predictions that outlive the Prefer: wait window
+REPLICATE_MAX_WAIT = float(os.getenv("REPLICATE_MAX_WAIT", "60"))
+REPLICATE_POLL_INITIAL = float(os.getenv("REPLICATE_POLL_INITIAL", "0.5"))
+REPLICATE_POLL_MAX = float(os.getenv("REPLICATE_POLL_MAX", "5.0"))
+
+# Bound concurrent Replicate predictions to match the upstream limit
+_REPLICATE_SEM = asyncio.Semaphore(int(os.getenv("REPLICATE_MAX_CONCURRENCY", "10")))
+
+async def close_http_client():
+    await _HTTP.aclose()
+
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 REPLICATE_API_KEY = os.getenv("REPLICATE_API_KEY")
 DATABASE_URL = os.getenv("DATABASE_URL")
@@ -17,8 +43,21 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 # Database connection (if available)
 USE_DB = bool(DATABASE_URL)
 if USE_DB:
+    import logging
     from sqlalchemy import create_engine, text
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    
+    # Explicit pool sizing: the default 5+10 connections queue chat logging
+    # behind pool waits under bursty traffic. pool_timeout fails fast instead.
+    engine = create_engine(
+        DATABASE_URL,
+        pool_pre_ping=True,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "5")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "280")),  # below MySQL wait_timeout
+    )
+    # Surface pool exhaustion/checkout warnings without debug noise
+    logging.getLogger("sqlalchemy.pool").setLevel(logging.WARNING)
     
     def query(sql: str, params: dict = None, fetch: str = "all"):
         with engine.connect() as conn:
@@ -32,6 +71,31 @@ if USE_DB:
                 return [dict(r._mapping) for r in rows]
             return None
 
+# Indexes behind the admin log queries: newest-first listing, flagged-only
+# listing and the unreviewed flagged queue. Plain composites (filter column
+# first, then created_at) are valid on MySQL as well as Postgres/SQLite;
+# MySQL has no CREATE INDEX IF NOT EXISTS, so existence is checked first.
+_CHAT_INDEXES = (
+    ("idx_chat_logs_created", "chat_logs", "(created_at)"),
+    ("idx_chat_logs_flagged", "chat_logs", "(flagged, created_at)"),
+    ("idx_flagged_content_unreviewed", "flagged_content", "(reviewed, created_at)"),
+)
+
+def create_chat_indexes():
+    """Create the chat log indexes if missing (runs once at startup)"""
+    if not USE_DB:
+        return
+    from sqlalchemy import inspect
+    inspector = inspect(engine)
+    for name, table, columns in _CHAT_INDEXES:
+        try:
+            if any(ix["name"] == name for ix in inspector.get_indexes(table)):
+                continue
+            with engine.begin() as conn:
+                conn.execute(text(f"CREATE INDEX {name} ON {table} {columns}"))
+        except Exception as e:
+            print(f"⚠️ Could not create chat index {name}: {e}")
+
 class ChatRequest(BaseModel):
     message: str
     generate_image: bool = False
@@ -41,6 +105,7 @@ class ChatRequest(BaseModel):
 class ImageGenerationRequest(BaseModel):
     prompt: str
     style: Optional[str] = "comic book art"
+    seed: Optional[int] = None
 
 # ─────────────────────────────────────────────────────
 # CONTENT MODERATION - Basic keyword filtering
@@ -51,20 +116,45 @@ HARMFUL_KEYWORDS = [
     # This is a basic example - use a proper moderation API for production
 ]
 
+# All keywords in one compiled alternation: a single C-level pass over
+# the message instead of one substring scan per keyword
+_HARMFUL_RE = re.compile("|".join(map(re.escape, HARMFUL_KEYWORDS)), re.IGNORECASE)
+
 def check_content_safety(text: str) -> tuple[bool, str]:
     """Basic content moderation - returns (is_safe, reason)"""
-    text_lower = text.lower()
+    match = _HARMFUL_RE.search(text)
     
-    for keyword in HARMFUL_KEYWORDS:
-        if keyword in text_lower:
-            return False, f"Contains inappropriate content: {keyword}"
+    if match:
+        return False, f"Contains inappropriate content: {match.group(0).lower()}"
     
     return True, ""
 
 # ─────────────────────────────────────────────────────
 # CHAT LOGGING
 # ─────────────────────────────────────────────────────
-def log_chat(
+_INSERT_CHAT_LOG = """
+    INSERT INTO chat_logs (
+        id, user_uid, session_id, message_type, message_content,
+        image_generated, image_url, image_prompt, model_used,
+        response_time_ms, flagged, flag_reason, ip_address, user_agent,
+        created_at
+    ) VALUES (
+        :id, :user_uid, :session_id, :message_type, :message_content,
+        :image_generated, :image_url, :image_prompt, :model_used,
+        :response_time_ms, :flagged, :flag_reason, :ip_address, :user_agent,
+        :created_at
+    )
+"""
+
+_INSERT_FLAGGED = """
+    INSERT INTO flagged_content (
+        chat_log_id, user_uid, reason, severity, created_at
+    ) VALUES (
+        :chat_log_id, :user_uid, :reason, :severity, :created_at
+    )
+"""
+
+def chat_log_row(
     user_uid: str,
     session_id: str,
     message_type: str,
@@ -78,89 +168,107 @@ def log_chat(
     flag_reason: str = None,
     ip_address: str = None,
     user_agent: str = None
-):
-    """Log chat message to database"""
+) -> dict:
+    """Build one chat_logs row for log_chat_rows"""
+    return {
+        "id": uuid.uuid4().hex,
+        "user_uid": user_uid,
+        "session_id": session_id,
+        "message_type": message_type,
+        "message_content": message_content,
+        "image_generated": image_generated,
+        "image_url": image_url,
+        "image_prompt": image_prompt,
+        "model_used": model_used,
+        "response_time_ms": response_time_ms,
+        "flagged": flagged,
+        "flag_reason": flag_reason,
+        "ip_address": ip_address,
+        "user_agent": user_agent,
+        "created_at": datetime.now().isoformat()
+    }
+
+def log_chat_rows(rows: list[dict]):
+    """Log chat messages to database in one transaction"""
+    
+    if not rows:
+        return
     
     if not USE_DB:
         # Fallback: log to file or just print
-        print(f"[CHAT LOG] {user_uid}: {message_content[:50]}...")
+        for row in rows:
+            print(f"[CHAT LOG] {row['user_uid']}: {row['message_content'][:50]}...")
         return
     
     try:
-        log_id = str(uuid.uuid4())
-        query("""
-            INSERT INTO chat_logs (
-                id, user_uid, session_id, message_type, message_content,
-                image_generated, image_url, image_prompt, model_used,
-                response_time_ms, flagged, flag_reason, ip_address, user_agent,
-                created_at
-            ) VALUES (
-                :id, :user_uid, :session_id, :message_type, :message_content,
-                :image_generated, :image_url, :image_prompt, :model_used,
-                :response_time_ms, :flagged, :flag_reason, :ip_address, :user_agent,
-                :created_at
-            )
-        """, {
-            "id": log_id,
-            "user_uid": user_uid,
-            "session_id": session_id,
-            "message_type": message_type,
-            "message_content": message_content,
-            "image_generated": image_generated,
-            "image_url": image_url,
-            "image_prompt": image_prompt,
-            "model_used": model_used,
-            "response_time_ms": response_time_ms,
-            "flagged": flagged,
-            "flag_reason": flag_reason,
-            "ip_address": ip_address,
-            "user_agent": user_agent,
-            "created_at": datetime.now().isoformat()
-        }, fetch=None)
-        
         # If flagged, create a moderation entry
-        if flagged:
-            query("""
-                INSERT INTO flagged_content (
-                    chat_log_id, user_uid, reason, severity, created_at
-                ) VALUES (
-                    :chat_log_id, :user_uid, :reason, :severity, :created_at
-                )
-            """, {
-                "chat_log_id": log_id,
-                "user_uid": user_uid,
-                "reason": flag_reason,
+        flagged = [
+            {
+                "chat_log_id": row["id"],
+                "user_uid": row["user_uid"],
+                "reason": row["flag_reason"],
                 "severity": "medium",  # Can be determined by severity of keywords
-                "created_at": datetime.now().isoformat()
-            }, fetch=None)
+                "created_at": row["created_at"]
+            }
+            for row in rows if row["flagged"]
+        ]
+        
+        # One connection + commit for the whole batch, executemany per table
+        with engine.begin() as conn:
+            conn.execute(text(_INSERT_CHAT_LOG), rows)
+            if flagged:
+                conn.execute(text(_INSERT_FLAGGED), flagged)
             
     except Exception as e:
         print(f"Error logging chat: {e}")
 
+# Rows from all requests are queued and written by one background task,
+# so a burst of messages becomes a single transaction every flush interval
+CHAT_LOG_FLUSH_INTERVAL = float(os.getenv("CHAT_LOG_FLUSH_INTERVAL", "0.2"))
+_log_queue: Optional[asyncio.Queue] = None
+_log_writer: Optional[asyncio.Task] = None
+
+def _drain_log_queue(rows: list[dict]) -> list[dict]:
+    while not _log_queue.empty():
+        rows.extend(_log_queue.get_nowait())
+    return rows
+
+async def _chat_log_writer():
+    while True:
+        rows = list(await _log_queue.get())
+        try:
+            await asyncio.sleep(CHAT_LOG_FLUSH_INTERVAL)
+        finally:
+            # Also runs on shutdown cancel, so a pending batch isn't dropped
+            await asyncio.to_thread(log_chat_rows, _drain_log_queue(rows))
+
+async def enqueue_chat_rows(rows: list[dict]):
+    """Hand a request's log rows to the batch writer (starts it on first use)"""
+    global _log_queue, _log_writer
+    if not rows:
+        return
+    if _log_queue is None:
+        _log_queue = asyncio.Queue()
+    if _log_writer is None or _log_writer.done():
+        _log_writer = asyncio.create_task(_chat_log_writer())
+    _log_queue.put_nowait(rows)
+
+async def flush_chat_logs():
+    """Stop the batch writer and write anything still queued"""
+    if _log_writer is not None:
+        _log_writer.cancel()
+        await asyncio.gather(_log_writer, return_exceptions=True)
+    if _log_queue is not None:
+        await asyncio.to_thread(log_chat_rows, _drain_log_queue([]))
+
 # ─────────────────────────────────────────────────────
 # GROQ AI CHAT
 # ─────────────────────────────────────────────────────
-def chat_with_groq(message: str) -> str:
-    """Chat with Groq's LLaMA model"""
-    
-    if not GROQ_API_KEY:
-        return "⚠️ AI chat unavailable. Please contact support."
-    
-    try:
-        start_time = time.time()
-        
-        response = requests.post(
-            "https://api.groq.com/openai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {GROQ_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            json={
-                "model": "llama-3.3-70b-versatile",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": """You are a helpful AI assistant for PanelX, a comic creation platform. 
+# Identical on every call and always first, so Groq can reuse the
+# cached prefix instead of re-processing it per message
+_SYSTEM_MSG = {
+    "role": "system",
+    "content": """You are a helpful AI assistant for PanelX, a comic creation platform. 
 
 Your role is to help comic creators with:
 - Brainstorming story ideas and plot concepts
@@ -172,23 +280,48 @@ Your role is to help comic creators with:
 Be friendly, creative, and encouraging. Keep responses concise (2-3 sentences).
 IMPORTANT: Never generate, suggest, or engage with harmful, violent, NSFW, or illegal content.
 If asked for inappropriate content, politely decline and redirect to creative comic ideas."""
-                    },
-                    {
-                        "role": "user",
-                        "content": message
-                    }
-                ],
-                "temperature": 0.7,
-                "max_tokens": 300,
-                "top_p": 1
-            },
-            timeout=30
-        )
+}
+
+GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+
+def groq_request(message: str, stream: bool = False) -> dict:
+    """Headers and JSON body for a Groq chat completion"""
+    return {
+        "headers": {
+            "Authorization": f"Bearer {GROQ_API_KEY}",
+            "Content-Type": "application/json"
+        },
+        "json": {
+            "model": "llama-3.3-70b-versatile",
+            "messages": [
+                _SYSTEM_MSG,
+                {
+                    "role": "user",
+                    "content": message
+                }
+            ],
+            "temperature": 0.7,
+            "max_tokens": 300,
+            "top_p": 1,
+            "stream": stream
+        }
+    }
+
+async def chat_with_groq(message: str) -> tuple[str, int]:
+    """Chat with Groq's LLaMA model"""
+    
+    if not GROQ_API_KEY:
+        return "⚠️ AI chat unavailable. Please contact support.", 0
+    
+    try:
+        start_time = time.time()
+        
+        response = await _HTTP.post(GROQ_CHAT_URL, **groq_request(message), timeout=30)
         
         response_time = int((time.time() - start_time) * 1000)
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             return data["choices"][0]["message"]["content"], response_time
         else:
             return f"⚠️ AI temporarily unavailable. Please try again!", 0
@@ -197,47 +330,144 @@ If asked for inappropriate content, politely decline and redirect to creative co
         print(f"Groq error: {e}")
         return "⚠️ Something went wrong. Please try again!", 0
 
+async def stream_groq(message: str):
+    """Yield Groq's reply piece by piece as the tokens arrive"""
+    
+    if not GROQ_API_KEY:
+        yield "⚠️ AI chat unavailable. Please contact support."
+        return
+    
+    try:
+        async with _HTTP.stream("POST", GROQ_CHAT_URL, **groq_request(message, stream=True)) as response:
+            if response.status_code != 200:
+                yield "⚠️ AI temporarily unavailable. Please try again!"
+                return
+            
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                data = line[len("data: "):]
+                if data == "[DONE]":
+                    break
+                delta = orjson.loads(data)["choices"][0]["delta"].get("content")
+                if delta:
+                    yield delta
+                    
+    except Exception as e:
+        print(f"Groq stream error: {e}")
+        yield "⚠️ Something went wrong. Please try again!"
+
+# ─────────────────────────────────────────────────────
+# IMAGE PROMPT CACHE - prompt hash → Replicate output URL
+# ─────────────────────────────────────────────────────
+IMAGE_CACHE_DB = "image_cache.sqlite"
+# Replicate deletes prediction outputs after about an hour,
+# so cached URLs must expire before their files do
+IMAGE_CACHE_TTL = int(os.getenv("IMAGE_CACHE_TTL", "3000"))
+
+with sqlite_db(IMAGE_CACHE_DB) as conn:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS prompt_cache (
+            key TEXT PRIMARY KEY,
+            image_url TEXT NOT NULL,
+            created_at REAL NOT NULL
+        )
+    """)
+
+def image_cache_key(model: str, input_data: dict) -> str:
+    raw = "\x1f".join([model] + [f"{k}={input_data[k]}" for k in sorted(input_data)])
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+def get_cached_image(key: str) -> Optional[str]:
+    with sqlite_db(IMAGE_CACHE_DB) as conn:
+        row = conn.execute(
+            "SELECT image_url FROM prompt_cache WHERE key = ? AND created_at > ?",
+            (key, time.time() - IMAGE_CACHE_TTL)
+        ).fetchone()
+    return row["image_url"] if row else None
+
+def set_cached_image(key: str, image_url: str):
+    with sqlite_db(IMAGE_CACHE_DB) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO prompt_cache (key, image_url, created_at) VALUES (?, ?, ?)",
+            (key, image_url, time.time())
+        )
+
 # ─────────────────────────────────────────────────────
 # IMAGE GENERATION (with logging)
 # ─────────────────────────────────────────────────────
-def call_replicate_api(model: str, input_data: dict):
-    """Call Replicate API"""
-    
+def replicate_headers() -> dict:
     if not REPLICATE_API_KEY:
         raise Exception("Replicate API key not configured")
     
-    headers = {
+    return {
         "Authorization": f"Token {REPLICATE_API_KEY}",
         "Content-Type": "application/json"
     }
+
+async def start_prediction(model: str, input_data: dict) -> dict:
+    """Create a Replicate prediction and return it (finished if it completed within the wait)"""
     
-    response = requests.post(
+    # Prefer: wait holds the request open until the prediction finishes,
+    # so most generations complete in this single round trip.
+    response = await _HTTP.post(
         "https://api.replicate.com/v1/predictions",
-        headers=headers,
-        json={"version": model, "input": input_data}
+        headers={**replicate_headers(), "Prefer": f"wait={min(int(REPLICATE_MAX_WAIT), 60)}"},
+        json={"version": model, "input": input_data},
+        timeout=REPLICATE_MAX_WAIT + 10
     )
     
-    if response.status_code != 201:
+    if response.status_code not in (200, 201):
         raise Exception(f"Replicate API error: {response.text}")
     
-    prediction = response.json()
-    prediction_id = prediction["id"]
+    return orjson.loads(response.content)
+
+async def await_prediction(prediction: dict, deadline: float = None):
+    """Return the output of a prediction, polling Replicate until it settles"""
     
-    for _ in range(60):
-        time.sleep(1)
-        status_response = requests.get(
-            f"https://api.replicate.com/v1/predictions/{prediction_id}",
-            headers=headers
-        )
-        result = status_response.json()
+    if deadline is None:
+        deadline = time.monotonic() + REPLICATE_MAX_WAIT
+    
+    headers = replicate_headers()
+    result = prediction
+    delay = REPLICATE_POLL_INITIAL
+    while True:
         status = result.get("status")
         
         if status == "succeeded":
             return result.get("output")
         elif status == "failed":
             raise Exception(f"Generation failed: {result.get('error')}")
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise Exception("Generation timed out")
+        
+        # Still starting/processing: poll with backoff
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 1.5, REPLICATE_POLL_MAX)
+        status_response = await _HTTP.get(
+            f"https://api.replicate.com/v1/predictions/{prediction['id']}",
+            headers=headers
+        )
+        
+        if status_response.status_code == 429:
+            # Rate limited: wait as long as Replicate asks before the next poll
+            try:
+                delay = max(delay, float(status_response.headers.get("Retry-After", delay)))
+            except ValueError:
+                pass
+            continue
+        
+        result = orjson.loads(status_response.content)
+
+async def call_replicate_api(model: str, input_data: dict):
+    """Call Replicate API"""
     
-    raise Exception("Generation timed out")
+    async with _REPLICATE_SEM:
+        deadline = time.monotonic() + REPLICATE_MAX_WAIT
+        prediction = await start_prediction(model, input_data)
+        return await await_prediction(prediction, deadline)
 
 @router.post("/generate-image")
 async def generate_image(req: ImageGenerationRequest, request: Request):
@@ -246,6 +476,10 @@ async def generate_image(req: ImageGenerationRequest, request: Request):
     if not REPLICATE_API_KEY:
         raise HTTPException(status_code=503, detail="Image generation unavailable")
     
+    # Don't start a paid Replicate run for a blank prompt
+    if not req.prompt.strip():
+        raise HTTPException(status_code=400, detail="Prompt required")
+    
     # Content safety check
     is_safe, reason = check_content_safety(req.prompt)
     if not is_safe:
@@ -256,7 +490,7 @@ async def generate_image(req: ImageGenerationRequest, request: Request):
         enhanced_prompt = f"{req.prompt}, {req.style}, highly detailed, professional comic art"
         
         model_version = "39ed52f2a78e934b3ba6e2a89f5b1c712de7dfea535525255b1aa35c5565e08b"
-        output = call_replicate_api(model_version, {
+        input_data = {
             "prompt": enhanced_prompt,
             "width": 896,
             "height": 1152,
@@ -264,21 +498,37 @@ async def generate_image(req: ImageGenerationRequest, request: Request):
             "guidance_scale": 7.5,
             "num_inference_steps": 30,
             "negative_prompt": "blurry, bad anatomy, ugly"
-        })
+        }
         
-        response_time = int((time.time() - start_time) * 1000)
+        # Only seeded requests are reproducible, so only they are cached:
+        # an unseeded request must give a new image every time
+        cache_key = None
+        image_url = None
+        if req.seed is not None:
+            input_data["seed"] = req.seed
+            cache_key = image_cache_key(model_version, input_data)
+            image_url = await asyncio.to_thread(get_cached_image, cache_key)
+        cached = image_url is not None
         
-        if not output:
-            raise Exception("No image generated")
+        if not cached:
+            output = await call_replicate_api(model_version, input_data)
+            
+            if not output:
+                raise Exception("No image generated")
+            
+            image_url = output[0] if isinstance(output, list) else output
+            if cache_key:
+                await asyncio.to_thread(set_cached_image, cache_key, image_url)
         
-        image_url = output[0] if isinstance(output, list) else output
+        response_time = int((time.time() - start_time) * 1000)
         
         return {
             "success": True,
             "image_url": image_url,
             "prompt": req.prompt,
             "model": "SDXL",
-            "response_time_ms": response_time
+            "response_time_ms": response_time,
+            "cached": cached
         }
         
     except Exception as e:
@@ -287,8 +537,23 @@ async def generate_image(req: ImageGenerationRequest, request: Request):
 # ─────────────────────────────────────────────────────
 # MAIN CHAT ENDPOINT (with logging)
 # ─────────────────────────────────────────────────────
+_GREETING = "👋 Hi! I'm the PanelX assistant. I can help you brainstorm stories, develop characters, plan panels, and write dialogue. Type \"generate: <description>\" to create a panel image!"
+_HELP = "I can help with story ideas, characters, panel layouts, dialogue, and creative feedback. Start a message with \"generate:\", \"draw:\", or \"create:\" to make a comic panel image."
+
+# Image requests start with "generate:", "draw:" or "create:"
+_IMAGE_PREFIX_RE = re.compile(r"\s*(?:generate|draw|create):", re.IGNORECASE)
+
+_FAST_RESPONSES = {
+    "hi": _GREETING,
+    "hello": _GREETING,
+    "hey": _GREETING,
+    "help": _HELP,
+    "thanks": "You're welcome! Happy creating! 🎨",
+    "thank you": "You're welcome! Happy creating! 🎨",
+}
+
 @router.post("/message")
-async def chat_message(req: ChatRequest, request: Request):
+async def chat_message(req: ChatRequest, request: Request, background_tasks: BackgroundTasks):
     """AI chat with comprehensive logging"""
     
     # Get request metadata
@@ -296,12 +561,17 @@ async def chat_message(req: ChatRequest, request: Request):
     user_agent = request.headers.get("user-agent", "unknown")
     session_id = req.session_id or str(uuid.uuid4())
     
+    # Rows collected below are written in one transaction after the
+    # response is sent, keeping the DB off the request's critical path
+    logs = []
+    background_tasks.add_task(enqueue_chat_rows, logs)
+    
     # Content safety check
     is_safe, flag_reason = check_content_safety(req.message)
     
     # Log user message
     if req.user_uid:
-        log_chat(
+        logs.append(chat_log_row(
             user_uid=req.user_uid,
             session_id=session_id,
             message_type="user",
@@ -310,20 +580,20 @@ async def chat_message(req: ChatRequest, request: Request):
             flag_reason=flag_reason if not is_safe else None,
             ip_address=client_ip,
             user_agent=user_agent
-        )
+        ))
     
     if not is_safe:
         warning_response = "⚠️ Your message contains inappropriate content. Let's keep our conversations creative and respectful! How about we focus on your comic ideas instead?"
         
         # Log warning response
         if req.user_uid:
-            log_chat(
+            logs.append(chat_log_row(
                 user_uid=req.user_uid,
                 session_id=session_id,
                 message_type="system",
                 message_content=warning_response,
                 ip_address=client_ip
-            )
+            ))
         
         return {
             "success": False,
@@ -332,47 +602,57 @@ async def chat_message(req: ChatRequest, request: Request):
             "flagged": True
         }
     
-    # Check for image generation
-    msg_lower = req.message.lower()
-    is_image_request = (
-        req.generate_image or 
-        "generate:" in msg_lower or 
-        "draw:" in msg_lower or 
-        "create:" in msg_lower
+    # Greetings and help requests get a canned reply without a Groq round trip
+    fast_response = None if req.generate_image else _FAST_RESPONSES.get(
+        req.message.strip().lower().rstrip("!.?")
     )
+    if fast_response:
+        if req.user_uid:
+            logs.append(chat_log_row(
+                user_uid=req.user_uid,
+                session_id=session_id,
+                message_type="ai",
+                message_content=fast_response,
+                model_used="canned",
+                response_time_ms=0,
+                ip_address=client_ip
+            ))
+        
+        return {
+            "success": True,
+            "response": fast_response,
+            "image_generated": False,
+            "session_id": session_id
+        }
+    
+    # Generation itself is the separate, paid /generate-image call; here an
+    # image request only gets a notice when Replicate isn't configured
+    is_image_request = req.generate_image or bool(_IMAGE_PREFIX_RE.match(req.message))
     
-    if is_image_request:
-        # Extract prompt
-        prompt = req.message
-        for prefix in ["generate:", "draw:", "create:"]:
-            if prefix in msg_lower:
-                prompt = req.message[req.message.lower().index(prefix) + len(prefix):].strip()
-                break
+    if is_image_request and not REPLICATE_API_KEY:
+        response_text = "🎨 Image generation is temporarily unavailable. But I can help you plan and brainstorm your comic ideas!"
         
-        if not REPLICATE_API_KEY:
-            response_text = "🎨 Image generation is temporarily unavailable. But I can help you plan and brainstorm your comic ideas!"
-            
-            if req.user_uid:
-                log_chat(
-                    user_uid=req.user_uid,
-                    session_id=session_id,
-                    message_type="system",
-                    message_content=response_text,
-                    model_used="none"
-                )
-            
-            return {
-                "success": True,
-                "response": response_text,
-                "image_generated": False
-            }
+        if req.user_uid:
+            logs.append(chat_log_row(
+                user_uid=req.user_uid,
+                session_id=session_id,
+                message_type="system",
+                message_content=response_text,
+                model_used="none"
+            ))
+        
+        return {
+            "success": True,
+            "response": response_text,
+            "image_generated": False
+        }
     
     # Regular chat with Groq
-    ai_response, response_time = chat_with_groq(req.message)
+    ai_response, response_time = await chat_with_groq(req.message)
     
     # Log AI response
     if req.user_uid:
-        log_chat(
+        logs.append(chat_log_row(
             user_uid=req.user_uid,
             session_id=session_id,
             message_type="ai",
@@ -380,7 +660,7 @@ async def chat_message(req: ChatRequest, request: Request):
             model_used="groq-llama-3.3-70b",
             response_time_ms=response_time,
             ip_address=client_ip
-        )
+        ))
     
     return {
         "success": True,
@@ -389,6 +669,62 @@ async def chat_message(req: ChatRequest, request: Request):
         "session_id": session_id
     }
 
+@router.post("/message/stream")
+async def chat_message_stream(req: ChatRequest, request: Request, background_tasks: BackgroundTasks):
+    """AI chat streamed as server-sent events, logged once the reply completes"""
+    
+    client_ip = request.client.host if request.client else "unknown"
+    user_agent = request.headers.get("user-agent", "unknown")
+    session_id = req.session_id or str(uuid.uuid4())
+    
+    # Content safety check happens before anything is streamed
+    is_safe, flag_reason = check_content_safety(req.message)
+    
+    logs = []
+    background_tasks.add_task(enqueue_chat_rows, logs)
+    
+    # Log user message (flagged attempts too, same as /message)
+    if req.user_uid:
+        logs.append(chat_log_row(
+            user_uid=req.user_uid,
+            session_id=session_id,
+            message_type="user",
+            message_content=req.message,
+            flagged=not is_safe,
+            flag_reason=flag_reason if not is_safe else None,
+            ip_address=client_ip,
+            user_agent=user_agent
+        ))
+    
+    if not is_safe:
+        # Background tasks don't run when the route raises, so queue now
+        await enqueue_chat_rows(logs)
+        raise HTTPException(status_code=400, detail=f"Inappropriate content: {flag_reason}")
+    
+    async def events():
+        start_time = time.time()
+        parts = []
+        
+        async for delta in stream_groq(req.message):
+            parts.append(delta)
+            yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+        
+        yield b"data: " + orjson.dumps({"done": True, "session_id": session_id}) + b"\n\n"
+        
+        # Background tasks run after the stream ends, so the full reply is logged
+        if req.user_uid:
+            logs.append(chat_log_row(
+                user_uid=req.user_uid,
+                session_id=session_id,
+                message_type="ai",
+                message_content="".join(parts),
+                model_used="groq-llama-3.3-70b",
+                response_time_ms=int((time.time() - start_time) * 1000),
+                ip_address=client_ip
+            ))
+    
+    return StreamingResponse(events(), media_type="text/event-stream", background=background_tasks)
+
 # ─────────────────────────────────────────────────────
 # ADMIN: View chat logs
 # ─────────────────────────────────────────────────────
@@ -414,14 +750,46 @@ async def get_chat_logs(limit: int = 100, flagged_only: bool = False):
                 LIMIT :limit
             """, {"limit": limit}, fetch="all")
         
-        return {
+        return orjson_response({
             "success": True,
             "logs": logs,
             "count": len(logs)
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/admin/logs/stream")
+async def stream_chat_logs(limit: int = 1000, flagged_only: bool = False):
+    """
+    Same rows as /admin/logs, streamed as NDJSON from a server-side cursor
+    so large exports don't build the whole result in memory (admin only)
+    """
+    
+    if not USE_DB:
+        return {"error": "Database not configured"}
+    
+    where = "WHERE flagged = 1" if flagged_only else ""
+    sql = text(f"""
+        SELECT * FROM chat_logs 
+        {where}
+        ORDER BY created_at DESC 
+        LIMIT :limit
+    """)
+    
+    def rows():
+        # Headers are already sent once rows flow, so a DB error can't become
+        # a 500 here: log it and end the body with an error line instead
+        try:
+            with engine.connect() as conn:
+                result = conn.execution_options(stream_results=True).execute(sql, {"limit": limit})
+                for row in result.mappings():
+                    yield orjson.dumps(dict(row)) + b"\n"
+        except Exception as e:
+            print(f"⚠️ Chat log export failed: {e}")
+            yield orjson.dumps({"error": str(e)}) + b"\n"
+    
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
 @router.get("/admin/flagged")
 async def get_flagged_content():
     """Get flagged content for review (admin only)"""
@@ -3,18 +3,23 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional
-import json, os, uuid
+import json, os, time, uuid
+
+from database.sqlite_store import sqlite_db
+from core.responses import orjson_response
 
 router = APIRouter()
 
+CREDITS_DB = "credits.sqlite"
+# Pre-SQLite stores, imported once on first start
 CREDITS_FILE = "data/credits.json"
 TRANSACTIONS_FILE = "data/transactions.json"
-os.makedirs("data", exist_ok=True)
 
-for f in [CREDITS_FILE, TRANSACTIONS_FILE]:
-    if not os.path.exists(f):
-        with open(f, "w") as file:
-            json.dump({}, file)
+# Short-lived per-uid balance cache for the read-heavy /balance endpoint.
+# Writes in this process invalidate; other workers see changes within the TTL.
+BALANCE_CACHE_TTL = float(os.getenv("BALANCE_CACHE_TTL", "5"))
+BALANCE_CACHE_MAX = 10000
+_balance_cache = {}  # uid -> (balance, expires_at)
 
 # ─────────────────────────────────────────────────────
 # FREE LAUNCH MODE - No payments needed!
@@ -40,47 +45,134 @@ CREDIT_PACKAGES = [
 # ─────────────────────────────────────────────────────
 # HELPERS
 # ─────────────────────────────────────────────────────
-def load_credits():
+def _load_legacy(path):
     try:
-        with open(CREDITS_FILE, "r") as f:
+        with open(path, "r") as f:
             return json.load(f)
     except:
         return {}
 
-def save_credits(data):
-    with open(CREDITS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
-
-def load_transactions():
+def _legacy_ts(created_at) -> int:
+    """ms timestamp for an imported transaction; 0 (oldest) if missing or malformed"""
     try:
-        with open(TRANSACTIONS_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return {}
+        return int(datetime.fromisoformat(created_at).timestamp() * 1000)
+    except (TypeError, ValueError):
+        return 0
+
+def init_credits_db():
+    """Create the credits/transactions tables and import any old JSON data"""
+    with sqlite_db(CREDITS_DB) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS credits (
+                uid TEXT PRIMARY KEY,
+                balance INTEGER NOT NULL DEFAULT 0,
+                total_purchased INTEGER NOT NULL DEFAULT 0,
+                total_used INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS transactions (
+                id TEXT,
+                uid TEXT NOT NULL,
+                type TEXT,
+                amount INTEGER,
+                description TEXT,
+                balance_after INTEGER,
+                payment_id TEXT,
+                ts INTEGER NOT NULL,
+                created_at TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tx_uid_ts ON transactions(uid, ts DESC)")
+
+        if conn.execute("SELECT 1 FROM credits LIMIT 1").fetchone():
+            return
+        conn.executemany(
+            "INSERT OR IGNORE INTO credits VALUES (?, ?, ?, ?, ?)",
+            [
+                (uid, c.get("balance", 0), c.get("total_purchased", 0),
+                 c.get("total_used", 0), c.get("created_at"))
+                for uid, c in _load_legacy(CREDITS_FILE).items()
+            ]
+        )
+        conn.executemany(
+            "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (tx.get("id"), uid, tx.get("type"), tx.get("amount"), tx.get("description"),
+                 tx.get("balance_after"), tx.get("payment_id"),
+                 _legacy_ts(tx.get("created_at")), tx.get("created_at"))
+                for uid, txs in _load_legacy(TRANSACTIONS_FILE).items()
+                for tx in txs
+            ]
+        )
 
-def save_transactions(data):
-    with open(TRANSACTIONS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+init_credits_db()
 
 def get_balance(uid: str) -> int:
-    credits = load_credits()
-    return credits.get(uid, {}).get("balance", 0)
+    cached = _balance_cache.get(uid)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    
+    with sqlite_db(CREDITS_DB) as conn:
+        row = conn.execute("SELECT balance FROM credits WHERE uid = ?", (uid,)).fetchone()
+    balance = row[0] if row else 0
+    
+    if len(_balance_cache) >= BALANCE_CACHE_MAX:
+        _balance_cache.clear()
+    _balance_cache[uid] = (balance, time.monotonic() + BALANCE_CACHE_TTL)
+    return balance
 
-def add_transaction(uid: str, tx_type: str, amount: int, description: str, balance_after: int, payment_id: str = None):
-    transactions = load_transactions()
-    if uid not in transactions:
-        transactions[uid] = []
+def invalidate_balance(uid: str):
+    _balance_cache.pop(uid, None)
+
+def _init_user(uid: str) -> tuple[dict, bool]:
+    """
+    Load a user's credit row, creating it with the free launch credits
+    (and its welcome transaction) if it doesn't exist yet.
+    Returns (user, created).
+    """
+    with sqlite_db(CREDITS_DB) as conn:
+        # Existing users (the common case) are a plain read, no write transaction
+        row = conn.execute("SELECT * FROM credits WHERE uid = ?", (uid,)).fetchone()
+        if row:
+            return dict(row), False
+        # OR IGNORE: a concurrent request may have created the row meanwhile
+        created = conn.execute(
+            "INSERT OR IGNORE INTO credits (uid, balance, created_at) VALUES (?, ?, ?)",
+            (uid, FREE_CREDITS_PER_USER, datetime.now().isoformat())
+        ).rowcount
+        user = dict(conn.execute("SELECT * FROM credits WHERE uid = ?", (uid,)).fetchone())
     
-    transactions[uid].append({
-        "id": f"tx_{int(datetime.now().timestamp() * 1000)}",
-        "type": tx_type,
-        "amount": amount,
-        "description": description,
-        "balance_after": balance_after,
-        "payment_id": payment_id,
-        "created_at": datetime.now().isoformat()
-    })
-    save_transactions(transactions)
+    if created:
+        invalidate_balance(uid)
+        add_transaction(
+            uid=uid,
+            tx_type="free",
+            amount=FREE_CREDITS_PER_USER,
+            description=f"🎉 Launch Special - {FREE_CREDITS_PER_USER} free credits!",
+            balance_after=FREE_CREDITS_PER_USER
+        )
+    return user, created
+
+def add_transaction(uid: str, tx_type: str, amount: int, description: str, balance_after: int, payment_id: str = None):
+    now = datetime.now()
+    ts = int(now.timestamp() * 1000)
+    with sqlite_db(CREDITS_DB) as conn:
+        conn.execute(
+            "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                f"tx_{ts}",
+                uid,
+                tx_type,
+                amount,
+                description,
+                balance_after,
+                payment_id,
+                ts,
+                now.isoformat()
+            )
+        )
 
 # ─────────────────────────────────────────────────────
 # MODELS
@@ -112,14 +204,14 @@ async def get_packages():
     return {"success": True, "packages": CREDIT_PACKAGES}
 
 @router.get("/balance/{uid}")
-async def get_user_balance(uid: str):
+def get_user_balance(uid: str):
     """Get current credit balance"""
     balance = get_balance(uid)
     
     if FREE_LAUNCH_MODE and balance == 0:
         # Auto-initialize with free credits
-        await init_user_credits(InitUserRequest(uid=uid))
-        balance = FREE_CREDITS_PER_USER
+        user, _ = _init_user(uid)
+        balance = user["balance"]
     
     return {
         "success": True,
@@ -129,34 +221,17 @@ async def get_user_balance(uid: str):
     }
 
 @router.post("/init")
-async def init_user_credits(req: InitUserRequest):
+def init_user_credits(req: InitUserRequest):
     """Initialize new user with free credits"""
-    credits = load_credits()
+    user, created = _init_user(req.uid)
     
-    if req.uid in credits:
+    if not created:
         return {
             "success": True,
             "message": "User already initialized",
-            "balance": credits[req.uid]["balance"]
+            "balance": user["balance"]
         }
     
-    # Give generous free credits for launch
-    credits[req.uid] = {
-        "balance": FREE_CREDITS_PER_USER,
-        "total_purchased": 0,
-        "total_used": 0,
-        "created_at": datetime.now().isoformat()
-    }
-    save_credits(credits)
-    
-    add_transaction(
-        uid=req.uid,
-        tx_type="free",
-        amount=FREE_CREDITS_PER_USER,
-        description=f"🎉 Launch Special - {FREE_CREDITS_PER_USER} free credits!",
-        balance_after=FREE_CREDITS_PER_USER
-    )
-    
     return {
         "success": True,
         "message": f"Welcome! You got {FREE_CREDITS_PER_USER} free credits!",
@@ -164,19 +239,14 @@ async def init_user_credits(req: InitUserRequest):
     }
 
 @router.post("/use")
-async def use_credits(req: UseCreditsRequest):
+def use_credits(req: UseCreditsRequest):
     """
     Deduct credits for AI generation
     During FREE_LAUNCH_MODE: doesn't actually deduct, just logs usage
     """
-    credits = load_credits()
-    
-    if req.uid not in credits:
-        # Auto-init
-        await init_user_credits(InitUserRequest(uid=req.uid))
-        credits = load_credits()
-    
-    current_balance = credits[req.uid]["balance"]
+    # Auto-init on first use
+    user, _ = _init_user(req.uid)
+    current_balance = user["balance"]
     
     if FREE_LAUNCH_MODE:
         # FREE MODE: Don't actually deduct credits!
@@ -198,16 +268,27 @@ async def use_credits(req: UseCreditsRequest):
         }
     
     # PAID MODE (after launch):
-    if current_balance < req.amount:
+    # Check and deduct in one statement so concurrent /use calls can't
+    # both pass the balance check and overdraw the account
+    with sqlite_db(CREDITS_DB) as conn:
+        deducted = conn.execute(
+            """
+            UPDATE credits
+            SET balance = balance - ?, total_used = total_used + ?
+            WHERE uid = ? AND balance >= ?
+            """,
+            (req.amount, req.amount, req.uid, req.amount)
+        ).rowcount
+        new_balance = conn.execute(
+            "SELECT balance FROM credits WHERE uid = ?", (req.uid,)
+        ).fetchone()[0]
+    
+    if not deducted:
         raise HTTPException(
             status_code=402,
-            detail=f"Insufficient credits. Have {current_balance}, need {req.amount}."
+            detail=f"Insufficient credits. Have {new_balance}, need {req.amount}."
         )
-    
-    new_balance = current_balance - req.amount
-    credits[req.uid]["balance"] = new_balance
-    credits[req.uid]["total_used"] = credits[req.uid].get("total_used", 0) + req.amount
-    save_credits(credits)
+    invalidate_balance(req.uid)
     
     add_transaction(
         uid=req.uid,
@@ -225,18 +306,27 @@ async def use_credits(req: UseCreditsRequest):
     }
 
 @router.get("/history/{uid}")
-async def get_transaction_history(uid: str):
-    """Get transaction history"""
-    transactions = load_transactions()
-    user_transactions = transactions.get(uid, [])
-    user_transactions.sort(key=lambda x: x["created_at"], reverse=True)
+def get_transaction_history(uid: str, limit: int = 100):
+    """Get transaction history, newest first"""
+    with sqlite_db(CREDITS_DB) as conn:
+        rows = conn.execute(
+            """
+            SELECT id, type, amount, description, balance_after, payment_id, created_at
+            FROM transactions
+            WHERE uid = ?
+            ORDER BY ts DESC
+            LIMIT ?
+            """,
+            (uid, limit)
+        ).fetchall()
+    user_transactions = [dict(row) for row in rows]
     
-    return {
+    return orjson_response({
         "success": True,
         "transactions": user_transactions,
         "total": len(user_transactions),
         "free_mode": FREE_LAUNCH_MODE
-    }
+    })
 
 @router.get("/status")
 async def credit_system_status():
@@ -5,19 +5,14 @@ from pydantic import BaseModel
 from datetime import datetime
 from typing import Optional, List
 import json
-import os
+
+from database.sqlite_store import sqlite_db
 
 router = APIRouter()
 
-# For now, we'll use a simple JSON file as database
-# Later you can migrate to PostgreSQL/MongoDB
+PROGRESS_DB = "reading_progress.sqlite"
+# Pre-SQLite store, imported once on first start
 PROGRESS_FILE = "data/reading_progress.json"
-os.makedirs("data", exist_ok=True)
-
-# Initialize file if it doesn't exist
-if not os.path.exists(PROGRESS_FILE):
-    with open(PROGRESS_FILE, "w") as f:
-        json.dump({}, f)
 
 # ========================================
 # MODELS
@@ -38,104 +33,132 @@ class ProgressResponse(BaseModel):
 # ========================================
 # HELPER FUNCTIONS
 # ========================================
-def load_progress():
-    """Load reading progress from file"""
-    try:
-        with open(PROGRESS_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return {}
+def init_progress_db():
+    """Create the progress table and import any old JSON data"""
+    with sqlite_db(PROGRESS_DB) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS progress (
+                user_id TEXT NOT NULL,
+                comic_id TEXT NOT NULL,
+                chapter_id TEXT NOT NULL,
+                page_number INTEGER,
+                completed INTEGER NOT NULL DEFAULT 0,
+                last_read TEXT,
+                PRIMARY KEY (user_id, comic_id, chapter_id)
+            )
+        """)
+        if conn.execute("SELECT 1 FROM progress LIMIT 1").fetchone():
+            return
+        try:
+            with open(PROGRESS_FILE, "r") as f:
+                legacy = json.load(f)
+        except:
+            return
+        conn.executemany(
+            "INSERT OR IGNORE INTO progress VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (user_id, comic_id, chapter_id, p.get("page_number"),
+                 int(bool(p.get("completed"))), p.get("last_read"))
+                for user_id, comics in legacy.items()
+                for comic_id, chapters in comics.items()
+                for chapter_id, p in chapters.items()
+            ]
+        )
 
-def save_progress(data):
-    """Save reading progress to file"""
-    with open(PROGRESS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+init_progress_db()
+
+def progress_entry(row) -> dict:
+    """Shape a progress row the way the API has always returned it"""
+    return {
+        "page_number": row["page_number"],
+        "completed": bool(row["completed"]),
+        "last_read": row["last_read"]
+    }
 
 # ========================================
 # ROUTES
 # ========================================
 
 @router.post("/update")
-async def update_progress(progress: ReadingProgress):
+def update_progress(progress: ReadingProgress):
     """Update user's reading progress for a chapter"""
     try:
-        data = load_progress()
-        
-        # Create nested structure: user_id -> comic_id -> chapter_id
-        if progress.user_id not in data:
-            data[progress.user_id] = {}
-        
-        if progress.comic_id not in data[progress.user_id]:
-            data[progress.user_id][progress.comic_id] = {}
-        
-        # Store chapter progress
-        data[progress.user_id][progress.comic_id][progress.chapter_id] = {
+        entry = {
             "page_number": progress.page_number,
             "completed": progress.completed,
             "last_read": progress.last_read
         }
         
-        save_progress(data)
+        with sqlite_db(PROGRESS_DB) as conn:
+            conn.execute(
+                """
+                INSERT INTO progress (user_id, comic_id, chapter_id, page_number, completed, last_read)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (user_id, comic_id, chapter_id) DO UPDATE SET
+                    page_number = excluded.page_number,
+                    completed = excluded.completed,
+                    last_read = excluded.last_read
+                """,
+                (progress.user_id, progress.comic_id, progress.chapter_id,
+                 progress.page_number, int(progress.completed), progress.last_read)
+            )
         
         return ProgressResponse(
             success=True,
             message="Progress updated successfully",
-            progress=data[progress.user_id][progress.comic_id][progress.chapter_id]
+            progress=entry
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/user/{user_id}/comic/{comic_id}")
-async def get_comic_progress(user_id: str, comic_id: str):
+def get_comic_progress(user_id: str, comic_id: str):
     """Get all reading progress for a specific comic"""
     try:
-        data = load_progress()
-        
-        if user_id in data and comic_id in data[user_id]:
-            return {
-                "success": True,
-                "progress": data[user_id][comic_id]
-            }
+        with sqlite_db(PROGRESS_DB) as conn:
+            rows = conn.execute(
+                "SELECT * FROM progress WHERE user_id = ? AND comic_id = ?",
+                (user_id, comic_id)
+            ).fetchall()
         
         return {
             "success": True,
-            "progress": {}
+            "progress": {row["chapter_id"]: progress_entry(row) for row in rows}
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/user/{user_id}")
-async def get_user_progress(user_id: str):
+def get_user_progress(user_id: str):
     """Get all reading progress for a user"""
     try:
-        data = load_progress()
+        with sqlite_db(PROGRESS_DB) as conn:
+            rows = conn.execute(
+                "SELECT * FROM progress WHERE user_id = ?", (user_id,)
+            ).fetchall()
         
-        if user_id in data:
-            return {
-                "success": True,
-                "progress": data[user_id]
-            }
+        progress = {}
+        for row in rows:
+            progress.setdefault(row["comic_id"], {})[row["chapter_id"]] = progress_entry(row)
         
         return {
             "success": True,
-            "progress": {}
+            "progress": progress
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/user/{user_id}/comic/{comic_id}/chapter/{chapter_id}")
-async def clear_chapter_progress(user_id: str, comic_id: str, chapter_id: str):
+def clear_chapter_progress(user_id: str, comic_id: str, chapter_id: str):
     """Clear progress for a specific chapter"""
     try:
-        data = load_progress()
+        with sqlite_db(PROGRESS_DB) as conn:
+            deleted = conn.execute(
+                "DELETE FROM progress WHERE user_id = ? AND comic_id = ? AND chapter_id = ?",
+                (user_id, comic_id, chapter_id)
+            ).rowcount
         
-        if (user_id in data and 
-            comic_id in data[user_id] and 
-            chapter_id in data[user_id][comic_id]):
-            
-            del data[user_id][comic_id][chapter_id]
-            save_progress(data)
-            
+        if deleted:
             return {
                 "success": True,
                 "message": "Progress cleared"
@@ -1,17 +1,30 @@
 from fastapi import APIRouter
-from database.memory_optimized import query_optimized, cleanup_connections
+from sqlalchemy import text
+from database.memory_optimized import query_optimized
+from core.cache import TTLCache
+from core.responses import orjson_response
 
 router = APIRouter()
 
+# Same listing for every reader; a short TTL keeps it fresh enough
+_series_cache = TTLCache(ttl=30)
+
+_SELECT_PUBLISHED = text(
+    "SELECT id, title, description, cover_image_url, genre, tags, view_count, like_count, creator_uid FROM series WHERE is_published = 1 ORDER BY created_at DESC LIMIT 50"
+)
+
 @router.get("/all")
 def get_all_series():
+    cached = _series_cache.get("all")
+    if cached:
+        return orjson_response(cached)
     try:
         series = query_optimized(
-            "SELECT id, title, description, cover_image_url, genre, tags, view_count, like_count, creator_uid FROM series WHERE is_published = 1 ORDER BY created_at DESC LIMIT 50",
+            _SELECT_PUBLISHED,
             fetch="all"
         )
-        return {"success": True, "series": series}
+        response = {"success": True, "series": series}
+        _series_cache.set("all", response)
+        return orjson_response(response)
     except Exception as e:
-        return {"success": False, "error": str(e)}
-    finally:
-        cleanup_connections()
\ No newline at end of file
+        return {"success": False, "error": str(e)}
\ No newline at end of file
@@ -1,9 +1,17 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from database.memory_optimized import query_optimized, cleanup_connections
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from database.memory_optimized import query_optimized
+from core.responses import orjson_response
 
 router = APIRouter()
 
+# Built once at import instead of per request
+_SELECT_PROFILE = text("SELECT uid, username, role, avatar_url, bio, credit_balance FROM users WHERE uid = :uid")
+_INSERT_USER = text("INSERT INTO users (uid, email, username, role) VALUES (:uid, :email, :username, :role)")
+_SELECT_EXISTING = text("SELECT uid FROM users WHERE uid = :uid OR email = :email")
+
 class UserCreate(BaseModel):
     uid: str
     email: str
@@ -17,7 +25,7 @@ def get_user_profile(firebase_uid: str):
     """Get user profile after Firebase login"""
     try:
         user = query_optimized(
-            "SELECT uid, username, role, avatar_url, bio, credit_balance FROM users WHERE uid = :uid",
+            _SELECT_PROFILE,
             {"uid": firebase_uid},
             fetch="one"
         )
@@ -30,43 +38,31 @@ def get_user_profile(firebase_uid: str):
             
     except Exception as e:
         return {"success": False, "error": str(e)}
-    finally:
-        cleanup_connections()
 
 @router.get("/{user_id}")
 def get_user(user_id: str):
     try:
         user = query_optimized(
-            "SELECT uid, username, role, avatar_url, bio, credit_balance FROM users WHERE uid = :uid",
+            _SELECT_PROFILE,
             {"uid": user_id},
             fetch="one"
         )
         
         if user:
-            return {"success": True, "user": user}
+            return orjson_response({"success": True, "user": user})
         else:
             return {"success": False, "error": "User not found"}
             
     except Exception as e:
         return {"success": False, "error": str(e)}
-    finally:
-        cleanup_connections()
 
 @router.post("/create")
 def create_user(user_data: UserCreate):
     try:
-        existing = query_optimized(
-            "SELECT uid FROM users WHERE uid = :uid OR email = :email",
-            {"uid": user_data.uid, "email": user_data.email},
-            fetch="one"
-        )
-
-        if existing:
-            return {"success": False, "error": "User already exists"}
-
-        # ✅ CREATE USER ONLY IF NOT EXISTS
+        # ✅ CREATE USER ONLY IF NOT EXISTS - the uid/email/username unique
+        # keys reject duplicates, so no pre-check round trip is needed
         query_optimized(
-            "INSERT INTO users (uid, email, username, role) VALUES (:uid, :email, :username, :role)",
+            _INSERT_USER,
             {
                 "uid": user_data.uid,
                 "email": user_data.email,
@@ -75,19 +71,25 @@ def create_user(user_data: UserCreate):
             },
             fetch=None
         )
-
-        return {
-            "success": True,
-            "message": "User created successfully",
-            "user": {
-                "uid": user_data.uid,
-                "username": user_data.username,
-                "role": user_data.role
-            }
-        }
-
+    except IntegrityError:
+        # Rare path: work out which key collided for the error message
+        existing = query_optimized(
+            _SELECT_EXISTING,
+            {"uid": user_data.uid, "email": user_data.email},
+            fetch="one"
+        )
+        if existing:
+            return {"success": False, "error": "User already exists"}
+        return {"success": False, "error": "Username already taken"}
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-    finally:
-        cleanup_connections()
\ No newline at end of file
+    return {
+        "success": True,
+        "message": "User created successfully",
+        "user": {
+            "uid": user_data.uid,
+            "username": user_data.username,
+            "role": user_data.role
+        }
+    }
\ No newline at end of file
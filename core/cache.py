@@ -0,0 +1,25 @@
+# backend/core/cache.py
+import time
+
+
+class TTLCache:
+    """
+    Tiny in-process cache for responses that are the same for every reader
+    (home page listings, trending). Each worker keeps its own copy.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = {}  # key -> (value, expires_at)
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def set(self, key: str, value):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+
+    def clear(self):
+        self._entries.clear()
@@ -24,6 +24,7 @@ engine = create_engine(
     pool_pre_ping=True,
     pool_size=5,
     max_overflow=10,
+    pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "280")),  # below MySQL wait_timeout
 )
 
 SessionLocal = sessionmaker(
@@ -0,0 +1,16 @@
+# backend/core/responses.py
+import orjson
+from fastapi import Response
+
+
+def orjson_response(content, status_code: int = 200) -> Response:
+    """
+    JSON response encoded with orjson, for routes returning large row lists.
+    Built on plain Response rather than the deprecated ORJSONResponse;
+    datetimes encode natively, anything else (e.g. Decimal) via str().
+    """
+    return Response(
+        content=orjson.dumps(content, default=str),
+        status_code=status_code,
+        media_type="application/json",
+    )
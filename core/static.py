@@ -0,0 +1,19 @@
+# backend/core/static.py
+from fastapi.staticfiles import StaticFiles
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles for write-once assets. Generated panels get a fresh
+    timestamped name on every render, so browsers/CDNs can keep them forever;
+    ETag/Last-Modified still come from Starlette for revalidation.
+    """
+
+    def __init__(self, *args, max_age: int = 31536000, immutable: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}" + (", immutable" if immutable else "")
+
+    def file_response(self, full_path, *args, **kwargs):
+        response = super().file_response(full_path, *args, **kwargs)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
@@ -1,12 +1,14 @@
 # backend/database/db.py
 import os
-import json
+import orjson
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "")
 USE_DB = bool(DATABASE_URL)
+DEBUG = os.getenv("DEBUG", "False").lower() == "true"
 
 # ─────────────────────────────────────────────────────
 # Fix for Render PostgreSQL
@@ -22,11 +24,17 @@ if USE_DB:
     from sqlalchemy import create_engine, text
     from sqlalchemy.orm import sessionmaker, declarative_base
 
+    # Same pool knobs as api/routes/chat.py: enough warm connections for
+    # bursty API traffic, and fail fast instead of queueing on checkout.
+    # pool_recycle must stay below the server's wait_timeout (300s on most
+    # managed MySQL) so idle connections are retired before MySQL drops them
     engine = create_engine(
         DATABASE_URL,
         pool_pre_ping=True,
-        pool_size=5,
-        max_overflow=10,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "5")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "280")),
     )
 
     SessionLocal = sessionmaker(
@@ -52,9 +60,9 @@ if USE_DB:
         fetch="one"  → single dict or None
         fetch=None   → no return (INSERT/UPDATE/DELETE)
         """
-        with engine.connect() as conn:
+        # begin() commits on exit (rolls back on error) in one step
+        with engine.begin() as conn:
             result = conn.execute(text(sql), params or {})
-            conn.commit()
 
             if fetch == "one":
                 row = result.fetchone()
@@ -81,22 +89,96 @@ else:
 
     def load_json(filename: str) -> dict:
         path = os.path.join(DATA_DIR, filename)
-        if not os.path.exists(path):
-            with open(path, "w") as f:
-                json.dump({}, f)
-        with open(path, "r") as f:
-            return json.load(f)
+        # A missing store reads as empty; the file is only created by
+        # the first save_json
+        try:
+            with open(path, "rb") as f:
+                return orjson.loads(f.read())
+        except FileNotFoundError:
+            return {}
 
     def save_json(filename: str, data: dict):
         path = os.path.join(DATA_DIR, filename)
-        with open(path, "w") as f:
-            json.dump(data, f, indent=2)
+        # Compact output: the whole store is rewritten on every save.
+        # Pretty-print only when debugging by hand.
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 if DEBUG else 0)
+        # Unique tmp file next to the store, so concurrent saves never share
+        # a half-written file; fsync before the rename so a crash can't
+        # leave an empty store behind
+        fd, tmp = tempfile.mkstemp(dir=DATA_DIR, prefix=f"{filename}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
 
 
 # ─────────────────────────────────────────────────────
 # MIGRATION: JSON files → Database
 # Run: python database/db.py
 # ─────────────────────────────────────────────────────
+def bulk_insert(table: str, cols: list, rows: list, suffix: str = "", batch: int = 1000):
+    """
+    Insert rows (list of dicts keyed by cols) as multi-row
+    INSERT ... VALUES (...), (...) statements of up to `batch` rows,
+    all inside one transaction. `suffix` is appended to each statement
+    (e.g. an ON CONFLICT clause).
+    """
+    col_list = ", ".join(cols)
+    with engine.begin() as conn:
+        for start in range(0, len(rows), batch):
+            chunk = rows[start:start + batch]
+            values = []
+            params = {}
+            for i, row in enumerate(chunk):
+                values.append("(" + ", ".join(f":{c}_{i}" for c in cols) + ")")
+                for c in cols:
+                    params[f"{c}_{i}"] = row[c]
+            conn.execute(
+                text(f"INSERT INTO {table} ({col_list}) VALUES {', '.join(values)} {suffix}"),
+                params
+            )
+
+
+def skip_existing_clause(key: str) -> str:
+    """
+    Suffix for bulk_insert that leaves an existing row untouched on a
+    unique-key conflict, in the syntax of whichever database DATABASE_URL
+    points at. Re-running the migration must never overwrite live data
+    with the JSON snapshot.
+    """
+    if engine.dialect.name == "mysql":
+        # MySQL has no DO NOTHING; a self-assignment is a no-op update
+        return f"ON DUPLICATE KEY UPDATE {key} = {key}"
+    return "ON CONFLICT DO NOTHING"
+
+
+_REQUIRED = object()
+
+# (table, source file, conflict key, {column: default}); _REQUIRED columns
+# must be present in every JSON record, the rest fall back to the default
+MIGRATIONS = [
+    ("users", "users.json", "uid", {
+        "uid": _REQUIRED, "email": _REQUIRED, "username": _REQUIRED, "role": _REQUIRED,
+        "avatar_url": None, "bio": None, "credit_balance": 0, "created_at": None,
+    }),
+    ("series", "series.json", "id", {
+        "id": _REQUIRED, "creator_uid": _REQUIRED, "title": _REQUIRED,
+        "description": None, "cover_image_url": None, "genre": None, "tags": None,
+        "is_published": False, "view_count": 0, "created_at": None, "published_at": None,
+    }),
+    ("episodes", "episodes.json", "id", {
+        "id": _REQUIRED, "series_id": _REQUIRED, "creator_uid": _REQUIRED,
+        "episode_number": _REQUIRED, "title": _REQUIRED, "thumbnail_url": None,
+        "is_published": False, "view_count": 0, "created_at": None, "published_at": None,
+    }),
+]
+
+
 def migrate_json_to_db():
     if not USE_DB:
         print("❌ No DATABASE_URL in .env - set it first!")
@@ -105,100 +187,29 @@ def migrate_json_to_db():
     DATA_DIR = "data"
 
     def load(f):
-        path = os.path.join(DATA_DIR, f)
-        if not os.path.exists(path):
+        try:
+            with open(os.path.join(DATA_DIR, f), "rb") as file:
+                return orjson.loads(file.read())
+        except FileNotFoundError:
             return {}
-        with open(path) as file:
-            return json.load(file)
 
     print("🔄 Migrating JSON data → Database...\n")
 
-    # ─── Users ───
-    try:
-        users = load("users.json")
-        count = 0
-        for uid, u in users.items():
-            query("""
-                INSERT INTO users
-                    (uid, email, username, role, avatar_url, bio, credit_balance, created_at)
-                VALUES
-                    (:uid, :email, :username, :role, :avatar_url, :bio, :credit_balance, :created_at)
-                ON CONFLICT (uid) DO NOTHING
-            """, {
-                "uid": u["uid"],
-                "email": u["email"],
-                "username": u["username"],
-                "role": u["role"],
-                "avatar_url": u.get("avatar_url"),
-                "bio": u.get("bio"),
-                "credit_balance": u.get("credit_balance", 0),
-                "created_at": u.get("created_at")
-            }, fetch=None)
-            count += 1
-        print(f"  ✅ Migrated {count} users")
-    except Exception as e:
-        print(f"  ❌ Users error: {e}")
-
-    # ─── Series ───
-    try:
-        series = load("series.json")
-        count = 0
-        for sid, s in series.items():
-            query("""
-                INSERT INTO series
-                    (id, creator_uid, title, description, cover_image_url,
-                     genre, tags, is_published, view_count, created_at, published_at)
-                VALUES
-                    (:id, :creator_uid, :title, :description, :cover_image_url,
-                     :genre, :tags, :is_published, :view_count, :created_at, :published_at)
-                ON CONFLICT (id) DO NOTHING
-            """, {
-                "id": s["id"],
-                "creator_uid": s["creator_uid"],
-                "title": s["title"],
-                "description": s.get("description"),
-                "cover_image_url": s.get("cover_image_url"),
-                "genre": s.get("genre"),
-                "tags": s.get("tags"),
-                "is_published": s.get("is_published", False),
-                "view_count": s.get("view_count", 0),
-                "created_at": s.get("created_at"),
-                "published_at": s.get("published_at")
-            }, fetch=None)
-            count += 1
-        print(f"  ✅ Migrated {count} series")
-    except Exception as e:
-        print(f"  ❌ Series error: {e}")
-
-    # ─── Episodes ───
-    try:
-        episodes = load("episodes.json")
-        count = 0
-        for eid, ep in episodes.items():
-            query("""
-                INSERT INTO episodes
-                    (id, series_id, creator_uid, episode_number, title,
-                     thumbnail_url, is_published, view_count, created_at, published_at)
-                VALUES
-                    (:id, :series_id, :creator_uid, :episode_number, :title,
-                     :thumbnail_url, :is_published, :view_count, :created_at, :published_at)
-                ON CONFLICT (id) DO NOTHING
-            """, {
-                "id": ep["id"],
-                "series_id": ep["series_id"],
-                "creator_uid": ep["creator_uid"],
-                "episode_number": ep["episode_number"],
-                "title": ep["title"],
-                "thumbnail_url": ep.get("thumbnail_url"),
-                "is_published": ep.get("is_published", False),
-                "view_count": ep.get("view_count", 0),
-                "created_at": ep.get("created_at"),
-                "published_at": ep.get("published_at")
-            }, fetch=None)
-            count += 1
-        print(f"  ✅ Migrated {count} episodes")
-    except Exception as e:
-        print(f"  ❌ Episodes error: {e}")
+    for table, filename, key, columns in MIGRATIONS:
+        try:
+            records = load(filename)
+            rows = [
+                {
+                    c: obj[c] if default is _REQUIRED else obj.get(c, default)
+                    for c, default in columns.items()
+                }
+                for obj in records.values()
+            ]
+            cols = list(columns)
+            bulk_insert(table, cols, rows, skip_existing_clause(key))
+            print(f"  ✅ Migrated {len(rows)} {table}")
+        except Exception as e:
+            print(f"  ❌ {table.capitalize()} error: {e}")
 
     print("\n🎉 Migration complete!")
 
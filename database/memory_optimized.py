@@ -17,7 +17,7 @@ if DATABASE_URL:
         DATABASE_URL,
         pool_size=1,              # Single connection to save memory
         max_overflow=2,           # Allow 2 extra connections during spikes
-        pool_recycle=900,         # Recycle every 15 minutes
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "280")),  # Below MySQL wait_timeout (300s managed default)
         pool_pre_ping=True,       # Check connections before use
         echo=False,               # No query logging
         connect_args={
@@ -40,11 +40,11 @@ if DATABASE_URL:
         finally:
             if conn:
                 conn.close()
-                gc.collect()  # Force garbage collection
     
-    def query_optimized(sql: str, params: dict = None, fetch: str = "all"):
+    def query_optimized(sql, params: dict = None, fetch: str = "all"):
         """
         Memory-optimized query function
+        sql: SQL string or a prebuilt text() statement
         fetch="all"  → list of dicts
         fetch="one"  → single dict or None
         fetch=None   → no return (INSERT/UPDATE/DELETE)
@@ -53,7 +53,7 @@ if DATABASE_URL:
             params = {}
             
         with get_db_connection() as conn:
-            result = conn.execute(text(sql), params)
+            result = conn.execute(text(sql) if isinstance(sql, str) else sql, params)
             conn.commit()
             
             if fetch == "one":
@@ -71,7 +71,7 @@ if DATABASE_URL:
         gc.collect()
         
 else:
-    def query_optimized(sql: str, params: dict = None, fetch: str = "all"):
+    def query_optimized(sql, params: dict = None, fetch: str = "all"):
         raise RuntimeError("DATABASE_URL not configured")
     
     def cleanup_connections():
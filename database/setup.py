@@ -7,10 +7,55 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Indexes added after the first release: (table, index, columns, old indexes
+# it replaces). CREATE TABLE IF NOT EXISTS never touches a table that already
+# exists, so ensure_indexes() applies these to existing databases too.
+INDEX_MIGRATIONS = [
+    ("series", "idx_series_trending", "is_published, view_count", ()),
+    ("series", "idx_series_creator", "creator_uid, created_at", ()),
+    ("episodes", "idx_episodes_creator", "creator_uid, created_at", ()),
+    ("series", "idx_series_pub_created", "is_published, created_at DESC", ("idx_series_published",)),
+    ("episodes", "idx_episodes_series_pub_num", "series_id, is_published, episode_number", ("idx_episodes_series",)),
+    ("reading_progress", "idx_progress_user_series", "user_uid, series_id", ("idx_progress_user",)),
+]
+
+
+def index_columns(conn, table: str) -> dict:
+    """Current indexes on table -> ordered list of their columns"""
+    rows = conn.execute(text("""
+        SELECT index_name, column_name FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = :table
+        ORDER BY index_name, seq_in_index
+    """), {"table": table})
+    indexes = {}
+    for name, column in rows:
+        indexes.setdefault(name, []).append(column)
+    return indexes
+
+
+def ensure_indexes(conn):
+    """Create/replace indexes so an existing schema matches INDEX_MIGRATIONS (safe to re-run)"""
+    for table, name, columns, replaces in INDEX_MIGRATIONS:
+        current = index_columns(conn, table)
+        wanted = [c.split()[0] for c in columns.split(",")]
+        changes = [f"DROP INDEX {old}" for old in replaces if old in current]
+        if current.get(name) != wanted:
+            if name in current:
+                changes.append(f"DROP INDEX {name}")
+            changes.append(f"ADD INDEX {name} ({columns})")
+        if changes:
+            # One ALTER so a foreign key never loses its supporting index
+            conn.execute(text(f"ALTER TABLE {table} " + ", ".join(changes)))
+            print(f"  {table}: {', '.join(changes)}")
+
+
 def create_tables():
     engine = create_engine(DATABASE_URL)
 
-    with engine.connect() as conn:
+    # One connection for all the DDL. MySQL commits implicitly after every
+    # CREATE TABLE / ALTER, so this block is not atomic and can't roll back;
+    # the seed data gets its own transaction once the schema is in place.
+    with engine.begin() as conn:
         print("Creating PanelX MySQL tables...")
 
         # ─── USERS ───
@@ -47,8 +92,9 @@ def create_tables():
                 updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 published_at DATETIME,
                 FOREIGN KEY (creator_uid) REFERENCES users(uid) ON DELETE CASCADE,
-                INDEX idx_series_creator (creator_uid),
-                INDEX idx_series_published (is_published)
+                INDEX idx_series_creator (creator_uid, created_at),
+                INDEX idx_series_pub_created (is_published, created_at DESC),
+                INDEX idx_series_trending (is_published, view_count)
             );
         """))
         print("  series table")
@@ -69,8 +115,8 @@ def create_tables():
                 FOREIGN KEY (series_id) REFERENCES series(id) ON DELETE CASCADE,
                 FOREIGN KEY (creator_uid) REFERENCES users(uid) ON DELETE CASCADE,
                 UNIQUE KEY unique_episode (series_id, episode_number),
-                INDEX idx_episodes_series (series_id),
-                INDEX idx_episodes_creator (creator_uid)
+                INDEX idx_episodes_series_pub_num (series_id, is_published, episode_number),
+                INDEX idx_episodes_creator (creator_uid, created_at)
             );
         """))
         print("  episodes table")
@@ -123,7 +169,7 @@ def create_tables():
                 FOREIGN KEY (series_id) REFERENCES series(id) ON DELETE CASCADE,
                 FOREIGN KEY (episode_id) REFERENCES episodes(id) ON DELETE CASCADE,
                 UNIQUE KEY unique_progress (user_uid, episode_id),
-                INDEX idx_progress_user (user_uid)
+                INDEX idx_progress_user_series (user_uid, series_id)
             );
         """))
         print("  reading_progress table")
@@ -208,7 +254,12 @@ def create_tables():
                 display_order INT DEFAULT 0
             );
         """))
+        print("  credit_packages table")
 
+        ensure_indexes(conn)
+        print("  indexes up to date")
+
+    with engine.begin() as conn:
         conn.execute(text("""
             INSERT IGNORE INTO credit_packages
                 (id, name, credits, price_cents, price_display, per_credit, badge, display_order)
@@ -218,22 +269,20 @@ def create_tables():
                 ('pro',     'Pro',     400,  1999, '$19.99', '$0.05/image', 'Best Value',   3),
                 ('studio',  'Studio',  1000, 3999, '$39.99', '$0.04/image', NULL,           4);
         """))
-        print("  credit_packages table + default packages")
-
-        conn.commit()
+        print("  default credit packages")
 
     print("\nAll tables created successfully!")
     print("Next: run 'python database/db.py' to migrate your JSON data")
 
 
-    if __name__ == "__main__":
-        try:
-            create_tables()
-        except Exception as e:
-            print(f"\nError: {e}")
-            print("\nMake sure:")
-            print("  1. MySQL is running")
-            print("  2. DATABASE_URL is set in .env")
-            print("  3. panelx_db database exists")
-            print("\n  Run in MySQL first:")
-            print("  CREATE DATABASE panelx_db;")
\ No newline at end of file
+if __name__ == "__main__":
+    try:
+        create_tables()
+    except Exception as e:
+        print(f"\nError: {e}")
+        print("\nMake sure:")
+        print("  1. MySQL is running")
+        print("  2. DATABASE_URL is set in .env")
+        print("  3. panelx_db database exists")
+        print("\n  Run in MySQL first:")
+        print("  CREATE DATABASE panelx_db;")
\ No newline at end of file
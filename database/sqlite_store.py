@@ -0,0 +1,28 @@
+# backend/database/sqlite_store.py
+# Local SQLite storage for the route modules that used to keep
+# whole-file JSON stores in data/ (credits, reading progress).
+import os
+import sqlite3
+from contextlib import contextmanager
+
+DATA_DIR = "data"
+os.makedirs(DATA_DIR, exist_ok=True)
+
+
+@contextmanager
+def sqlite_db(filename: str):
+    """
+    Yield a connection to data/<filename>.
+    Commits when the block exits cleanly, rolls back on error.
+    """
+    conn = sqlite3.connect(os.path.join(DATA_DIR, filename), timeout=5)
+    conn.row_factory = sqlite3.Row
+    try:
+        # WAL lets readers run while a writer commits; NORMAL sync is
+        # durable across app crashes and avoids an fsync per commit
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
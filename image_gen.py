@@ -1,9 +1,12 @@
 import os
 import time
+import asyncio
+import hashlib
 import uvicorn
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from core.static import CachedStaticFiles
+from database.sqlite_store import sqlite_db
 from dotenv import load_dotenv
 from huggingface_hub import InferenceClient, HfApi
 from PIL import Image
@@ -26,9 +29,57 @@ app.add_middleware(
 
 HF_TOKEN = os.getenv("HF_TOKEN")
 HF_MODEL = "black-forest-labs/FLUX.1-dev"
+
+# One client per process so its HTTP session (and TLS connection) is
+# reused across generations instead of rebuilt per request
+_HF_CLIENT = InferenceClient(model=HF_MODEL, token=HF_TOKEN)
+# Cap in-flight generations so bursts don't trip HF rate limits
+_HF_SEM = asyncio.Semaphore(int(os.getenv("HF_MAX_CONCURRENCY", "10")))
 GENERATED_DIR = os.path.join(os.path.dirname(__file__), "generated")
 os.makedirs(GENERATED_DIR, exist_ok=True)
-app.mount("/generated", StaticFiles(directory=GENERATED_DIR), name="generated")
+app.mount("/generated", CachedStaticFiles(directory=GENERATED_DIR), name="generated")
+# Public origin the panel URLs point at (main server serves /generated too)
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000").rstrip("/")
+GENERATED_URL = f"{PUBLIC_BASE_URL}/generated"
+
+PROMPT_SUFFIX = (
+    ", full color, highly detailed, cinematic lighting, "
+    "vertical webtoon panel, sharp lines, expressive faces"
+)
+
+# -------------------------------------------------------
+# 🗂️ PROMPT CACHE
+# -------------------------------------------------------
+# Exact-match cache: hash of (model, seed, full prompt) -> generated filename.
+# Only seeded requests are cached; without a seed every call must give a new
+# image (same rule as Character_gen's _cache_key).
+# Kept in SQLite under data/ rather than next to the panels: it is not
+# served publicly, and every worker reads/writes the same rows instead of
+# rewriting a whole file from its own in-memory copy.
+PROMPT_INDEX_DB = "image_prompts.sqlite"
+LEGACY_INDEX_FILE = os.path.join(GENERATED_DIR, "index.json")
+
+with sqlite_db(PROMPT_INDEX_DB) as conn:
+    conn.execute("CREATE TABLE IF NOT EXISTS prompt_index (key TEXT PRIMARY KEY, filename TEXT NOT NULL)")
+
+# The old index.json only held unseeded entries, which are no longer cached;
+# take it off /generated
+try:
+    os.remove(LEGACY_INDEX_FILE)
+except FileNotFoundError:
+    pass
+
+def prompt_key(full_prompt: str, seed: int) -> str:
+    return hashlib.blake2b(f"{HF_MODEL}\n{seed}\n{full_prompt}".encode(), digest_size=16).hexdigest()
+
+def lookup_prompt(key: str):
+    with sqlite_db(PROMPT_INDEX_DB) as conn:
+        row = conn.execute("SELECT filename FROM prompt_index WHERE key = ?", (key,)).fetchone()
+    return row["filename"] if row else None
+
+def record_prompt(key: str, filename: str):
+    with sqlite_db(PROMPT_INDEX_DB) as conn:
+        conn.execute("INSERT OR REPLACE INTO prompt_index (key, filename) VALUES (?, ?)", (key, filename))
 
 # -------------------------------------------------------
 # 🔑 CHECK TOKEN
@@ -45,10 +96,20 @@ def check_hf_token():
 # -------------------------------------------------------
 # 📸 IMAGE GENERATION
 # -------------------------------------------------------
+def save_image(image, filepath: str):
+    """Write an HF result (PIL image or raw bytes) to filepath"""
+    if not isinstance(image, Image.Image):
+        # If it's bytes, convert to PIL Image first
+        image = Image.open(io.BytesIO(image))
+    # zlib level 1: panels are written once and served as-is, and the
+    # default level 6 costs far more CPU for a few percent smaller files
+    image.save(filepath, format="PNG", compress_level=1, optimize=False)
+
 @app.post("/generate-image")
 async def generate_image(request: Request):
     """
-    POST JSON: {"prompt": "A swordsman under the moonlight, manhwa style"}
+    POST JSON: {"prompt": "A swordsman under the moonlight, manhwa style", "seed": 42}
+    "seed" is optional; only seeded requests are reproducible and cached.
     Returns: {"image_url": ".../generated/panel_123.png"}
     """
     data = await request.json()
@@ -56,40 +117,45 @@ async def generate_image(request: Request):
     if not prompt:
         raise HTTPException(status_code=400, detail="Prompt required")
 
-    full_prompt = (
-        f"{prompt}, full color, highly detailed, cinematic lighting, "
-        "vertical webtoon panel, sharp lines, expressive faces"
-    )
+    seed = data.get("seed")
+    if seed is not None and not isinstance(seed, int):
+        raise HTTPException(status_code=400, detail="Seed must be an integer")
+
+    full_prompt = prompt + PROMPT_SUFFIX
 
     print(f"🧠 Using model: {HF_MODEL}")
     print(f"📝 Prompt: {full_prompt}")
 
+    key = prompt_key(full_prompt, seed) if seed is not None else None
+    cached = await asyncio.to_thread(lookup_prompt, key) if key else None
+    if cached and os.path.exists(os.path.join(GENERATED_DIR, cached)):
+        print(f"♻️ Cache hit: {cached}")
+        return {
+            "image_url": f"{GENERATED_URL}/{cached}",
+            "meta": {"prompt": full_prompt, "cached": True},
+        }
+
     try:
         # Generate filename BEFORE using it
-        timestamp = int(time.time() * 1000)
+        timestamp = time.time_ns() // 1_000_000
         filename = f"panel_{timestamp}.png"
         filepath = os.path.join(GENERATED_DIR, filename)
         
-        # Create Hugging Face client
-        client = InferenceClient(model=HF_MODEL, token=HF_TOKEN)
-        
         print(f"🎨 Generating image...")
         
-        # Generate image
-        image = client.text_to_image(full_prompt)
+        # Generate image (blocking HTTP call, so run it off the event loop)
+        async with _HF_SEM:
+            image = await asyncio.to_thread(_HF_CLIENT.text_to_image, full_prompt, seed=seed)
+        
+        # Decode + encode the PNG in a worker thread too
+        await asyncio.to_thread(save_image, image, filepath)
+        print(f"✅ Image saved to: {filepath}")
         
-        # Save the image
-        if isinstance(image, Image.Image):
-            image.save(filepath)
-            print(f"✅ Image saved to: {filepath}")
-        else:
-            # If it's bytes, convert to PIL Image first
-            image_pil = Image.open(io.BytesIO(image))
-            image_pil.save(filepath)
-            print(f"✅ Image saved to: {filepath}")
+        if key:
+            await asyncio.to_thread(record_prompt, key, filename)
         
         return {
-            "image_url": f"http://localhost:8000/generated/{filename}",  # Use port 8000 (main server)
+            "image_url": f"{GENERATED_URL}/{filename}",
             "meta": {"prompt": full_prompt},
         }
         
@@ -1,30 +1,14 @@
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from core.static import CachedStaticFiles
 from contextlib import asynccontextmanager
 import os
 
 from core.config import settings
 from core.database import init_db
-from api.routes import images, stories, characters, auth
 from api.routes import images, stories, characters, auth, chat
-from api.routes import chat
-
-
-app = FastAPI()
-
-app.include_router(chat.router)
-
-@app.on_event("startup")
-async def startup():
-    # Auto-create all tables on startup
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created!")
-
-@app.get("/")
-def home():
-    return {"status": "PanelX API is running"}
+from api.Character_gen import close_hf_client
 
 # Setup logging
 logging.basicConfig(
@@ -40,9 +24,13 @@ os.makedirs(settings.GENERATED_DIR, exist_ok=True)
 async def lifespan(app: FastAPI):
     logger.info("🚀 Starting PanelX Backend...")
     await init_db()
+    chat.create_chat_indexes()
     logger.info("✅ Database initialized")
     yield
     logger.info("👋 Shutting down PanelX Backend...")
+    await chat.flush_chat_logs()
+    await close_hf_client()
+    await chat.close_http_client()
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -63,7 +51,7 @@ app.add_middleware(
 
 app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
 # Mount static files for generated images
-app.mount("/generated", StaticFiles(directory=settings.GENERATED_DIR), name="generated")
+app.mount("/generated", CachedStaticFiles(directory=settings.GENERATED_DIR), name="generated")
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -95,5 +83,10 @@ if __name__ == "__main__":
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=settings.DEBUG
+        reload=settings.DEBUG,
+        # reload and workers are exclusive: one process while developing,
+        # one per core (capped) in production so PIL/JSON work runs in parallel.
+        # Semaphores and caches are per process: the effective HF/Replicate
+        # concurrency cap is workers x HF_MAX_CONCURRENCY / REPLICATE_MAX_CONCURRENCY
+        workers=1 if settings.DEBUG else int(os.getenv("WEB_CONCURRENCY", min(os.cpu_count() or 1, 4)))
     )
\ No newline at end of file
@@ -1,9 +1,10 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional
 import os
+import asyncio
 import httpx
 from groq import Groq
 from dotenv import load_dotenv
@@ -15,12 +16,16 @@ load_dotenv()
 # ═══════════════════════════════════════════
 from api.routes.users import router as users_router
 from api.routes.series import router as series_router
+from core.cache import TTLCache
 
 app = FastAPI(title="PanelX API", version="3.0.0")
 
 # ✅ FIXED: viewer_store at module level (NOT inside a function)
 viewer_store = {}
 
+# Trending is identical for every reader; serve it from memory for a minute
+trending_cache = TTLCache(ttl=60)
+
 # ═══════════════════════════════════════════
 # CORS
 # ═══════════════════════════════════════════
@@ -91,7 +96,7 @@ def root():
 # AI CHAT
 # ═══════════════════════════════════════════
 @app.post("/api/chat/message")
-async def chat_message(body: ChatMessage):
+def chat_message(body: ChatMessage):
     try:
         groq_api_key = os.getenv("GROQ_API_KEY")
         if not groq_api_key:
@@ -174,7 +179,10 @@ async def purchase_credits(body: CreditRequest):
 # SERIES - TRENDING (must be before /{series_id} routes)
 # ═══════════════════════════════════════════
 @app.get("/api/series/trending")
-async def get_trending_series():
+def get_trending_series():
+    cached = trending_cache.get("trending")
+    if cached:
+        return cached
     try:
         from database import get_db
         from sqlalchemy import text
@@ -186,7 +194,9 @@ async def get_trending_series():
             LIMIT 10
         """))
         series = [dict(row._mapping) for row in result]
-        return {"success": True, "series": series}
+        response = {"success": True, "series": series}
+        trending_cache.set("trending", response)
+        return response
     except Exception as e:
         print(f"Trending error: {e}")
         return {"success": True, "series": []}
@@ -195,7 +205,7 @@ async def get_trending_series():
 # READING PROGRESS
 # ═══════════════════════════════════════════
 @app.get("/api/reading-progress/user/{user_uid}")
-async def get_reading_progress(user_uid: str):
+def get_reading_progress(user_uid: str):
     try:
         from database import get_db
         from sqlalchemy import text
@@ -211,12 +221,11 @@ async def get_reading_progress(user_uid: str):
         return {"success": True, "progress": []}
 
 @app.post("/api/reading-progress/update")
-async def update_reading_progress(request: Request):
+def update_reading_progress(body: dict):
     try:
         from database import get_db
         from sqlalchemy import text
         import uuid
-        body = await request.json()
         db = next(get_db())
         db.execute(text("""
             INSERT INTO reading_progress (id, user_uid, comic_id, chapter_id, page_number, completed, last_read)
@@ -244,7 +253,7 @@ async def update_reading_progress(request: Request):
 # EPISODES
 # ═══════════════════════════════════════════
 @app.get("/api/series/episode/creator/{user_uid}")
-async def get_creator_episodes(user_uid: str):
+def get_creator_episodes(user_uid: str):
     try:
         from database import get_db
         from sqlalchemy import text
@@ -254,7 +263,7 @@ async def get_creator_episodes(user_uid: str):
                 SELECT e.*, s.title as series_title
                 FROM episodes e
                 JOIN series s ON e.series_id = s.id
-                WHERE s.user_uid = :uid
+                WHERE e.creator_uid = :uid
                 ORDER BY e.created_at DESC
             """),
             {"uid": user_uid}
@@ -356,7 +365,7 @@ async def mangadex_chapter_info(chapter_id: str):
         return {"data": None}
 
 @app.get("/api/episodes/{episode_id}")
-async def get_episode(episode_id: str):
+def get_episode(episode_id: str):
     try:
         from database import get_db
         from sqlalchemy import text
@@ -374,12 +383,11 @@ async def get_episode(episode_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/episodes/create")
-async def create_episode(request: Request):
+def create_episode(body: dict):
     try:
         from database import get_db
         from sqlalchemy import text
         import uuid
-        body = await request.json()
         db = next(get_db())
         episode_id = str(uuid.uuid4())
         db.execute(
@@ -406,7 +414,7 @@ async def create_episode(request: Request):
 # STUDIO
 # ═══════════════════════════════════════════
 @app.get("/api/studio/{episode_id}")
-async def get_studio_project(episode_id: str):
+def get_studio_project(episode_id: str):
     try:
         from database import get_db
         from sqlalchemy import text
@@ -431,12 +439,11 @@ async def get_studio_project(episode_id: str):
         return {"success": False, "error": str(e)}
 
 @app.put("/api/studio/{episode_id}/save")
-async def save_studio_project(episode_id: str, request: Request):
+def save_studio_project(episode_id: str, body: dict):
     try:
         from database import get_db
         from sqlalchemy import text
         import json
-        body = await request.json()
         db = next(get_db())
         db.execute(
             text("UPDATE episodes SET title = :title, panels_data = :panels_data WHERE id = :id"),
@@ -455,7 +462,7 @@ async def save_studio_project(episode_id: str, request: Request):
 # IMAGE GENERATION
 # ═══════════════════════════════════════════
 @app.post("/api/generate/image")
-async def generate_image(body: ImageGenerateRequest):
+def generate_image(body: ImageGenerateRequest):
     try:
         import replicate
         replicate_key = os.getenv("REPLICATE_API_KEY")
@@ -491,7 +498,8 @@ async def generate_strip(body: StripGenerateRequest):
         client = replicate.Client(api_token=replicate_key)
         groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         panel_count = body.panels or 4
-        breakdown = groq_client.chat.completions.create(
+        breakdown = await asyncio.to_thread(
+            groq_client.chat.completions.create,
             model="llama-3.3-70b-versatile",
             messages=[{"role": "user", "content": f"Break this story into {panel_count} comic panel descriptions. Story: {body.prompt}. Return ONLY a JSON array of {panel_count} strings. No extra text."}],
             max_tokens=500,
@@ -500,16 +508,22 @@ async def generate_strip(body: StripGenerateRequest):
         panel_prompts = json.loads(panel_prompts_raw)
         if not isinstance(panel_prompts, list):
             panel_prompts = [body.prompt] * panel_count
+        # Run the panel predictions concurrently so the strip takes
+        # as long as the slowest panel instead of the sum of all of them
+        outputs = await asyncio.gather(*[
+            asyncio.to_thread(
+                client.run,
+                "stability-ai/sdxl:39ed52f2319f9f8a56de0dc05aeb00e6c2d8bfdc",
+                input={"prompt": f"{prompt}, {body.style}, high quality, comic art", "width": 768, "height": 1024, "num_inference_steps": 20}
+            )
+            for prompt in panel_prompts[:panel_count]
+        ], return_exceptions=True)
         images = []
-        for prompt in panel_prompts[:panel_count]:
-            try:
-                output = client.run(
-                    "stability-ai/sdxl:39ed52f2319f9f8a56de0dc05aeb00e6c2d8bfdc",
-                    input={"prompt": f"{prompt}, {body.style}, high quality, comic art", "width": 768, "height": 1024, "num_inference_steps": 20}
-                )
-                images.append(output[0] if isinstance(output, list) else str(output))
-            except Exception as img_err:
-                print(f"Panel generation error: {img_err}")
+        for output in outputs:
+            if isinstance(output, Exception):
+                print(f"Panel generation error: {output}")
+                continue
+            images.append(output[0] if isinstance(output, list) else str(output))
         return {"success": True, "images": images, "prompts": panel_prompts, "count": len(images)}
     except Exception as e:
         print(f"Strip generation error: {e}")
@@ -543,7 +557,7 @@ async def viewer_leave(chapter_id: str, body: ViewerSession):
 # COMMENTS
 # ═══════════════════════════════════════════
 @app.get("/api/comments/{chapter_id}")
-async def get_comments(chapter_id: str):
+def get_comments(chapter_id: str):
     try:
         from database import get_db
         from sqlalchemy import text
@@ -570,7 +584,7 @@ async def get_comments(chapter_id: str):
         return {"success": True, "comments": []}
 
 @app.post("/api/comments/{chapter_id}")
-async def post_comment(chapter_id: str, body: CommentCreate):
+def post_comment(chapter_id: str, body: CommentCreate):
     try:
         from database import get_db
         from sqlalchemy import text
@@ -607,7 +621,7 @@ async def post_comment(chapter_id: str, body: CommentCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/comments/{comment_id}")
-async def delete_comment(comment_id: str, user_uid: str):
+def delete_comment(comment_id: str, user_uid: str):
     try:
         from database import get_db
         from sqlalchemy import text
@@ -1,5 +1,7 @@
 -- MySQL Workbench Setup Script for PanelX
 -- Run these commands in MySQL Workbench to set up your database
+-- Already have the tables? CREATE TABLE IF NOT EXISTS won't add new indexes
+-- to them; run `python database/setup.py`, which updates indexes in place.
 
 -- 1. Create the database
 CREATE DATABASE IF NOT EXISTS panelx_db CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
@@ -36,8 +38,9 @@ CREATE TABLE IF NOT EXISTS series (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     published_at DATETIME,
     FOREIGN KEY (creator_uid) REFERENCES users(uid) ON DELETE CASCADE,
-    INDEX idx_series_creator (creator_uid),
-    INDEX idx_series_published (is_published)
+    INDEX idx_series_creator (creator_uid, created_at),
+    INDEX idx_series_pub_created (is_published, created_at DESC),
+    INDEX idx_series_trending (is_published, view_count)
 );
 
 CREATE TABLE IF NOT EXISTS episodes (
@@ -54,8 +57,8 @@ CREATE TABLE IF NOT EXISTS episodes (
     FOREIGN KEY (series_id) REFERENCES series(id) ON DELETE CASCADE,
     FOREIGN KEY (creator_uid) REFERENCES users(uid) ON DELETE CASCADE,
     UNIQUE KEY unique_episode (series_id, episode_number),
-    INDEX idx_episodes_series (series_id),
-    INDEX idx_episodes_creator (creator_uid)
+    INDEX idx_episodes_series_pub_num (series_id, is_published, episode_number),
+    INDEX idx_episodes_creator (creator_uid, created_at)
 );
 
 CREATE TABLE IF NOT EXISTS panels (
@@ -96,7 +99,7 @@ CREATE TABLE IF NOT EXISTS reading_progress (
     FOREIGN KEY (series_id) REFERENCES series(id) ON DELETE CASCADE,
     FOREIGN KEY (episode_id) REFERENCES episodes(id) ON DELETE CASCADE,
     UNIQUE KEY unique_progress (user_uid, episode_id),
-    INDEX idx_progress_user (user_uid)
+    INDEX idx_progress_user_series (user_uid, series_id)
 );
 
 CREATE TABLE IF NOT EXISTS bookmarks (
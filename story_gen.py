@@ -1,12 +1,18 @@
 import requests
+from requests.adapters import HTTPAdapter
+
+# One keep-alive session for the local Ollama server instead of a new
+# connection per story
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
 
 def generate_story(prompt: str, genre: str = "fantasy") -> str:
     combined_prompt = f"Create a {genre} comic story: {prompt}"
 
     try:
-        response = requests.post(
+        response = _session.post(
             "http://localhost:11434/api/generate",
-            json={"model": "tinyllama", "prompt": combined_prompt},
+            json={"model": "tinyllama", "prompt": combined_prompt, "stream": False},
             timeout=60
         )
         if response.status_code == 200:
@@ -1,12 +1,19 @@
 import replicate
 import os
+import shutil
+import asyncio
 from tempfile import NamedTemporaryFile
 
-async def generate_ai_image(image, style, clothes, accessory, background, pose, emotion, prompt):
-    # Save uploaded image temporarily
+def save_upload(upload) -> str:
+    """Copy an UploadFile to a temp file in 1 MiB chunks, return its path"""
+    upload.file.seek(0)
     with NamedTemporaryFile(delete=False, suffix=".png") as temp_img:
-        temp_img.write(await image.read())
-        img_path = temp_img.name
+        shutil.copyfileobj(upload.file, temp_img, 1 << 20)
+        return temp_img.name
+
+async def generate_ai_image(image, style, clothes, accessory, background, pose, emotion, prompt):
+    # Save uploaded image temporarily (streamed, off the event loop)
+    img_path = await asyncio.to_thread(save_upload, image)
 
     # Build natural prompt
     full_prompt = (
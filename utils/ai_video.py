@@ -1,11 +1,11 @@
 import replicate
 import os
-from tempfile import NamedTemporaryFile
+import asyncio
+from utils.ai_image import save_upload
 
 async def generate_ai_video(image, style, clothes, accessory, background, pose, emotion, prompt):
-    with NamedTemporaryFile(delete=False, suffix=".png") as temp_img:
-        temp_img.write(await image.read())
-        img_path = temp_img.name
+    # Save uploaded image temporarily (streamed, off the event loop)
+    img_path = await asyncio.to_thread(save_upload, image)
 
     full_prompt = (
         f"Generate a short {style}-style animated scene. "